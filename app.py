@@ -1,8 +1,21 @@
 from flask import Flask, render_template, request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 import re
+import hmac
 import random
+import signal
+import threading
 import time
+from solver_pool import SolverPool, PoolSaturated, PoolTimeout
+from singleflight import SingleFlight
+from prepared_question import prepare
+from classifier import ClassifierSessions, OutOfSync
+from knowledge_base import get_knowledge_base, validate_templates, KnowledgeBaseReloader
+import combinatorics
+import linear_algebra
+import numeric_calculus
+from profiler import get_request_profiler, wants_profile
 
 # Create Flask app instance
 app = Flask(__name__)
@@ -11,6 +24,19 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'jee-ai-solver-secret-key')
 app.config['DEBUG'] = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
 
+# Larger request bodies get a 413 (asgi_app.py applies the same limit)
+MAX_BODY_BYTES = 64 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_BODY_BYTES
+
+# Executor mode: 'inline' solves on the request thread, 'process' uses a bounded process pool
+app.config['EXECUTOR'] = os.environ.get('JEE_EXECUTOR', 'inline').lower()
+app.config['POOL_WORKERS'] = int(os.environ.get('JEE_POOL_WORKERS', os.cpu_count() or 1))
+app.config['POOL_QUEUE'] = int(os.environ.get('JEE_POOL_QUEUE', 2 * app.config['POOL_WORKERS']))
+app.config['SOLVE_TIMEOUT'] = float(os.environ.get('JEE_SOLVE_TIMEOUT', 30))
+
+# Admin endpoints are disabled unless a token is configured
+app.config['ADMIN_TOKEN'] = os.environ.get('JEE_ADMIN_TOKEN')
+
 # JEE AI Solver - Custom AI Logic
 class JEESolver:
     def __init__(self):
@@ -43,23 +69,24 @@ class JEESolver:
             r'probability|statistics|permutation|combination',
             r'matrix|determinant|vector|linear'
         ]
+        
+        # subject -> (patterns, topic names), index-aligned
+        self.topic_tables = {
+            'physics': (self.physics_patterns,
+                        ['Kinematics', 'Dynamics', 'Energy & Work', 'Waves & Oscillations',
+                         'Electricity', 'Magnetism', 'Thermodynamics']),
+            'chemistry': (self.chemistry_patterns,
+                          ['Solutions', 'Chemical Reactions', 'Acid-Base', 'Organic Chemistry',
+                           'Atomic Structure', 'Thermochemistry', 'Chemical Kinetics']),
+            'mathematics': (self.math_patterns,
+                            ['Calculus', 'Integration', 'Trigonometry', 'Algebra',
+                             'Geometry', 'Probability', 'Linear Algebra'])
+        }
 
     def identify_topic(self, question, subject):
         """Identify the specific topic within a subject"""
-        question_lower = question.lower()
-        
-        if subject == 'physics':
-            patterns = self.physics_patterns
-            topics = ['Kinematics', 'Dynamics', 'Energy & Work', 'Waves & Oscillations', 
-                     'Electricity', 'Magnetism', 'Thermodynamics']
-        elif subject == 'chemistry':
-            patterns = self.chemistry_patterns  
-            topics = ['Solutions', 'Chemical Reactions', 'Acid-Base', 'Organic Chemistry',
-                     'Atomic Structure', 'Thermochemistry', 'Chemical Kinetics']
-        else:  # mathematics
-            patterns = self.math_patterns
-            topics = ['Calculus', 'Integration', 'Trigonometry', 'Algebra',
-                     'Geometry', 'Probability', 'Linear Algebra']
+        question_lower = prepare(question).text
+        patterns, topics = self.topic_tables.get(subject, self.topic_tables['mathematics'])
         
         for i, pattern in enumerate(patterns):
             if re.search(pattern, question_lower):
@@ -67,20 +94,24 @@ class JEESolver:
         
         return f"{subject.title()} Problem"
 
+    def solution_template(self, name):
+        """Static solution text from the current knowledge base (hot-reloadable)"""
+        return get_knowledge_base().templates[name]
+
     def solve_physics(self, question):
         """Solve physics problems with step-by-step solutions"""
-        question_lower = question.lower()
+        question = prepare(question)
         
         # Kinematics problems
-        if any(word in question_lower for word in ['velocity', 'acceleration', 'motion', 'distance', 'time']):
+        if question.mentions('velocity', 'acceleration', 'motion', 'distance', 'time'):
             return self.solve_kinematics(question)
         
         # Energy problems
-        elif any(word in question_lower for word in ['energy', 'work', 'power', 'potential', 'kinetic']):
+        elif question.mentions('energy', 'work', 'power', 'potential', 'kinetic'):
             return self.solve_energy(question)
         
         # Electric circuit problems
-        elif any(word in question_lower for word in ['current', 'voltage', 'resistance', 'circuit']):
+        elif question.mentions('current', 'voltage', 'resistance', 'circuit'):
             return self.solve_circuits(question)
         
         # General physics solution
@@ -88,429 +119,146 @@ class JEESolver:
 
     def solve_kinematics(self, question):
         """Solve kinematics problems"""
-        return """🎯 KINEMATICS PROBLEM SOLUTION
-
-📋 Problem Analysis:
-This is a kinematics problem involving motion with constant acceleration.
-
-📐 Relevant Formulas:
-• v = u + at (velocity-time relation)
-• s = ut + ½at² (displacement with time)
-• v² = u² + 2as (velocity-displacement relation)
-• s = (u + v)t/2 (average velocity method)
-
-🔍 Step-by-Step Solution:
-
-Step 1: Identify Given Values
-- Extract the known quantities (initial velocity, acceleration, time, etc.)
-- Identify what needs to be found
-
-Step 2: Choose Appropriate Formula
-- Select the kinematic equation that relates known and unknown quantities
-- Ensure all quantities are in consistent units (SI preferred)
-
-Step 3: Substitute and Solve
-- Substitute the known values into the chosen formula
-- Solve algebraically for the unknown quantity
-- Check units in your final answer
-
-Step 4: Verify Result
-- Use an alternative method if possible
-- Check if the answer makes physical sense
-
-💡 JEE Tips:
-• Always draw a diagram showing the motion
-• Pay attention to the direction (+ or - signs)
-• Common mistake: Forgetting that acceleration due to gravity is negative when upward is positive
-• Practice with different initial conditions
-
-🎓 Concept Review:
-Kinematics deals with describing motion without considering the forces causing it. Focus on understanding the relationships between displacement, velocity, acceleration, and time."""
+        return self.solution_template('kinematics')
 
     def solve_energy(self, question):
         """Solve energy problems"""
-        return """⚡ ENERGY & WORK PROBLEM SOLUTION
-
-📋 Problem Analysis:
-This involves energy conservation or work-energy theorem applications.
-
-📐 Key Formulas:
-• KE = ½mv² (Kinetic Energy)
-• PE = mgh (Gravitational Potential Energy)
-• W = F·s·cos(θ) (Work done by force)
-• Work-Energy Theorem: W_net = ΔKE
-
-🔍 Step-by-Step Solution:
-
-Step 1: Identify Energy Types
-- Kinetic energy (motion)
-- Potential energy (position/height)
-- Work done by external forces
-
-Step 2: Apply Conservation Principles
-- If no non-conservative forces: Total Energy = Constant
-- E_initial = E_final
-- KE₁ + PE₁ = KE₂ + PE₂
-
-Step 3: Calculate Each Energy Component
-- Substitute known values
-- Be careful with reference points (especially for PE)
-
-Step 4: Solve for Unknown
-- Use algebraic manipulation
-- Check dimensional consistency
-
-💡 JEE Strategy:
-• Choose reference level for potential energy wisely
-• Draw energy bar charts for visualization
-• Remember: Energy is always conserved (1st Law of Thermodynamics)
-• Watch for friction - it converts mechanical energy to heat
-
-🎓 Advanced Concepts:
-Consider spring potential energy (½kx²) and rotational kinetic energy (½Iω²) for comprehensive problems."""
+        return self.solution_template('energy')
 
     def solve_circuits(self, question):
         """Solve electric circuit problems"""
-        return """🔌 ELECTRIC CIRCUITS SOLUTION
-
-📋 Problem Analysis:
-This is an electric circuits problem involving current, voltage, and resistance relationships.
-
-📐 Fundamental Laws:
-• Ohm's Law: V = IR
-• Kirchhoff's Current Law (KCL): ΣI_in = ΣI_out
-• Kirchhoff's Voltage Law (KVL): ΣV = 0 (around closed loop)
-• Power: P = VI = I²R = V²/R
-
-🔍 Step-by-Step Solution:
-
-Step 1: Circuit Analysis
-- Identify series and parallel combinations
-- Redraw circuit if necessary for clarity
-- Mark current directions and voltage polarities
-
-Step 2: Apply Kirchhoff's Laws
-- Use KCL at junctions/nodes
-- Use KVL around closed loops
-- Set up system of equations
-
-Step 3: Solve for Unknowns
-- Use substitution or elimination methods
-- Calculate equivalent resistances for complex networks
-
-Step 4: Find Required Quantities
-- Calculate power dissipation if needed
-- Verify using alternative methods
-
-💡 JEE Tips:
-• For resistors in series: R_eq = R₁ + R₂ + R₃...
-• For resistors in parallel: 1/R_eq = 1/R₁ + 1/R₂ + 1/R₃...
-• Current divider rule for parallel branches
-• Voltage divider rule for series resistors
-
-🎓 Advanced Topics:
-Consider AC circuits, capacitors, inductors, and impedance for higher-level problems."""
+        return self.solution_template('circuits')
 
     def solve_chemistry(self, question):
         """Solve chemistry problems"""
-        question_lower = question.lower()
+        question = prepare(question)
         
-        if any(word in question_lower for word in ['molarity', 'molality', 'concentration', 'solution']):
+        if question.mentions('molarity', 'molality', 'concentration', 'solution'):
             return self.solve_solutions(question)
-        elif any(word in question_lower for word in ['reaction', 'equation', 'balance', 'stoichiometry']):
+        elif question.mentions('reaction', 'equation', 'balance', 'stoichiometry'):
             return self.solve_stoichiometry(question)
-        elif any(word in question_lower for word in ['acid', 'base', 'ph', 'buffer']):
+        elif question.mentions('acid', 'base', 'ph', 'buffer'):
             return self.solve_acid_base(question)
         else:
             return self.general_chemistry_solution(question)
 
     def solve_solutions(self, question):
         """Solve solution chemistry problems"""
-        return """🧪 SOLUTION CHEMISTRY PROBLEM
-
-📋 Problem Analysis:
-This involves concentration calculations, molarity, molality, or solution preparation.
-
-📐 Key Formulas:
-• Molarity (M) = moles of solute / liters of solution
-• Molality (m) = moles of solute / kg of solvent  
-• Normality (N) = gram equivalents / liters of solution
-• Parts per million (ppm) = (mass of solute / mass of solution) × 10⁶
-
-🔍 Step-by-Step Solution:
-
-Step 1: Identify Given Information
-- Mass or moles of solute
-- Volume of solution or mass of solvent
-- Molecular weight of compounds
-
-Step 2: Convert Units if Necessary
-- Grams to moles using molecular weight
-- mL to L for volume
-- Ensure consistent units throughout
-
-Step 3: Apply Appropriate Formula
-- Choose molarity, molality, or normality based on question
-- Substitute values carefully
-
-Step 4: Calculate and Verify
-- Perform calculation with proper significant figures
-- Check if answer is reasonable
-
-💡 JEE Important Points:
-• Molarity changes with temperature (volume changes)
-• Molality is temperature independent
-• For dilution: M₁V₁ = M₂V₂
-• Density relationship: M = (% × density × 10) / Molecular weight
-
-🎓 Common Mistakes to Avoid:
-- Confusing molarity with molality
-- Using mass of solution instead of mass of solvent for molality
-- Not converting mL to L"""
+        return self.solution_template('solutions')
 
     def solve_stoichiometry(self, question):
         """Solve stoichiometry problems"""
-        return """⚖️ STOICHIOMETRY PROBLEM SOLUTION
-
-📋 Problem Analysis:
-This involves quantitative relationships in chemical reactions.
-
-📐 Key Concepts:
-• Balanced chemical equation
-• Mole ratios from coefficients
-• Limiting reagent concept
-• Theoretical vs actual yield
-
-🔍 Step-by-Step Solution:
-
-Step 1: Write Balanced Equation
-- Balance the chemical equation properly
-- Check that atoms are conserved
-
-Step 2: Convert to Moles
-- Convert given masses to moles using molecular weights
-- Use: moles = mass(g) / molecular weight(g/mol)
-
-Step 3: Use Mole Ratios
-- Apply stoichiometric ratios from balanced equation
-- Identify limiting reagent if multiple reactants given
-
-Step 4: Calculate Product Amount
-- Convert moles of product back to grams if needed
-- Calculate percentage yield if actual yield is given
-
-💡 JEE Strategy:
-• Always start with a balanced equation
-• Limiting reagent = reagent that produces least product
-• % Yield = (Actual yield / Theoretical yield) × 100
-• Use dimensional analysis for unit conversions
-
-🎓 Advanced Applications:
-Consider gas stoichiometry using STP conditions (22.4 L/mol) and solution stoichiometry with molarity."""
+        return self.solution_template('stoichiometry')
 
     def solve_acid_base(self, question):
         """Solve acid-base problems"""
-        return """🔬 ACID-BASE CHEMISTRY SOLUTION
-
-📋 Problem Analysis:
-This involves pH, pOH, acid-base equilibrium, or titration calculations.
-
-📐 Fundamental Equations:
-• pH = -log[H⁺]
-• pOH = -log[OH⁻]
-• pH + pOH = 14 (at 25°C)
-• Kw = [H⁺][OH⁻] = 1.0 × 10⁻¹⁴
-
-🔍 Step-by-Step Solution:
-
-Step 1: Identify Acid/Base Type
-- Strong acid/base: Complete dissociation
-- Weak acid/base: Use Ka or Kb values
-- Buffer: Use Henderson-Hasselbalch equation
-
-Step 2: Write Equilibrium Expression
-- For weak acids: Ka = [H⁺][A⁻]/[HA]
-- For weak bases: Kb = [OH⁻][BH⁺]/[B]
-
-Step 3: Set Up ICE Table (if needed)
-- Initial, Change, Equilibrium concentrations
-- Apply equilibrium constant expressions
-
-Step 4: Calculate pH/pOH
-- Solve quadratic equations for weak acids/bases
-- Use approximations when justified (5% rule)
-
-💡 JEE Key Points:
-• Strong acids: HCl, HNO₃, H₂SO₄, HClO₄, HBr, HI
-• Strong bases: Group 1 hydroxides, Ca(OH)₂, Sr(OH)₂, Ba(OH)₂
-• Henderson-Hasselbalch: pH = pKa + log([A⁻]/[HA])
-• At equivalence point in titration: moles acid = moles base
-
-🎓 Buffer Systems:
-Buffers resist pH changes and are most effective when pH ≈ pKa ± 1."""
+        return self.solution_template('acid_base')
 
     def solve_mathematics(self, question):
         """Solve mathematics problems"""
-        question_lower = question.lower()
+        question = prepare(question)
         
-        if any(word in question_lower for word in ['derivative', 'differentiat', 'calculus']):
+        if question.mentions('derivative', 'differentiat', 'calculus'):
             return self.solve_calculus(question)
-        elif any(word in question_lower for word in ['integral', 'integration']):
+        elif question.mentions('integral', 'integration', 'integrate', '∫'):
             return self.solve_integration(question)
-        elif any(word in question_lower for word in ['trigonometry', 'sine', 'cosine', 'tangent']):
+        elif question.mentions('limit', 'lim ', 'lim_'):
+            return self.solve_limit(question)
+        elif question.mentions('trigonometry', 'sine', 'cosine', 'tangent'):
             return self.solve_trigonometry(question)
+        elif question.mentions('matrix', 'matrices', 'determinant', 'inverse', 'rank', 'vector',
+                               'dot product', 'cross product', 'linear', 'system', 'equations') \
+                or linear_algebra.has_system(question.raw):
+            return self.solve_linear_algebra(question)
+        elif combinatorics.has_cue(question.raw):
+            # nPr / nCr / factorial / binomial questions get an exact answer
+            return self.solve_probability(question)
         else:
             return self.general_math_solution(question)
 
     def solve_calculus(self, question):
         """Solve calculus/differentiation problems"""
-        return """📊 CALCULUS - DIFFERENTIATION SOLUTION
-
-📋 Problem Analysis:
-This involves finding derivatives using various differentiation rules.
-
-📐 Key Differentiation Rules:
-• Power Rule: d/dx(xⁿ) = nx^(n-1)
-• Product Rule: d/dx(uv) = u'v + uv'
-• Quotient Rule: d/dx(u/v) = (u'v - uv')/v²
-• Chain Rule: d/dx[f(g(x))] = f'(g(x)) · g'(x)
-
-🔍 Step-by-Step Solution:
-
-Step 1: Identify Function Type
-- Polynomial, exponential, logarithmic, trigonometric
-- Composite functions requiring chain rule
-- Products or quotients of functions
-
-Step 2: Apply Appropriate Rule
-- Use power rule for simple polynomials
-- Apply product/quotient rule for combinations
-- Use chain rule for composite functions
-
-Step 3: Simplify Expression
-- Combine like terms
-- Factor if possible
-- Express in simplest form
-
-Step 4: Verify Result
-- Check using alternative methods if possible
-- Ensure dimensional consistency
-
-💡 JEE Important Derivatives:
-• d/dx(eˣ) = eˣ
-• d/dx(ln x) = 1/x
-• d/dx(sin x) = cos x
-• d/dx(cos x) = -sin x
-• d/dx(tan x) = sec²x
-
-🎓 Applications:
-• Rate of change problems
-• Maxima and minima (set f'(x) = 0)
-• Related rates in physics problems
-• Tangent lines and normal lines"""
+        return self.solution_template('calculus')
 
     def solve_integration(self, question):
-        """Solve integration problems"""
-        return """∫ INTEGRATION PROBLEM SOLUTION
-
-📋 Problem Analysis:
-This involves finding antiderivatives or evaluating definite integrals.
-
-📐 Key Integration Rules:
-• Power Rule: ∫xⁿ dx = x^(n+1)/(n+1) + C
-• ∫eˣ dx = eˣ + C
-• ∫(1/x) dx = ln|x| + C
-• ∫sin x dx = -cos x + C
-• ∫cos x dx = sin x + C
-
-🔍 Step-by-Step Solution:
-
-Step 1: Identify Integration Method
-- Direct integration using standard formulas
-- Substitution method (u-substitution)
-- Integration by parts: ∫u dv = uv - ∫v du
-- Partial fractions for rational functions
-
-Step 2: Apply Method
-- Make appropriate substitutions
-- Use integration tables for complex functions
-- Break complex expressions into simpler parts
-
-Step 3: Evaluate (for definite integrals)
-- Apply limits of integration
-- Use Fundamental Theorem of Calculus
-
-Step 4: Add Constant of Integration
-- For indefinite integrals, always add + C
-- For definite integrals, compute F(b) - F(a)
-
-💡 JEE Integration Techniques:
-• Substitution: Choose u such that du appears in integral
-• Integration by parts: Choose u using LIATE rule
-  (Logarithmic, Inverse trig, Algebraic, Trigonometric, Exponential)
-• Partial fractions: For rational functions
-
-🎓 Geometric Applications:
-• Area under curves
-• Volume of revolution
-• Arc length calculations"""
+        """Solve integration problems, evaluating definite integrals numerically"""
+        question = prepare(question)
+        estimate = numeric_calculus.evaluate(question.raw)
+        
+        if estimate is None or estimate.kind != 'integral':
+            return self.solution_template('integration')
+        
+        return self.solution_template('definite_integral').format(
+            expression=estimate.expression,
+            answer=numeric_calculus.format_estimate(estimate),
+            details=estimate.note
+        )
+
+    def solve_limit(self, question):
+        """Solve limit problems by numeric extrapolation"""
+        question = prepare(question)
+        estimate = numeric_calculus.evaluate(question.raw)
+        
+        if estimate is None or estimate.kind != 'limit':
+            return self.solution_template('calculus')
+        
+        return self.solution_template('limit').format(
+            expression=estimate.expression,
+            answer=numeric_calculus.format_estimate(estimate)
+        )
 
     def solve_trigonometry(self, question):
         """Solve trigonometry problems"""
-        return """📐 TRIGONOMETRY PROBLEM SOLUTION
-
-📋 Problem Analysis:
-This involves trigonometric functions, identities, or equation solving.
-
-📐 Fundamental Identities:
-• sin²θ + cos²θ = 1
-• 1 + tan²θ = sec²θ  
-• 1 + cot²θ = csc²θ
-• sin(A ± B) = sin A cos B ± cos A sin B
-• cos(A ± B) = cos A cos B ∓ sin A sin B
-
-🔍 Step-by-Step Solution:
-
-Step 1: Identify Problem Type
-- Solving trigonometric equations
-- Proving identities
-- Finding values of trigonometric functions
-- Applications in triangles
-
-Step 2: Choose Strategy
-- Use fundamental identities
-- Apply sum/difference formulas
-- Convert to single trigonometric function
-- Use double angle or half angle formulas
-
-Step 3: Algebraic Manipulation
-- Substitute identities
-- Factor expressions
-- Use quadratic formula if needed
-
-Step 4: Find Solutions
-- Consider all possible angles in given range
-- Use unit circle for standard angles
-- Express answers in radians or degrees as required
-
-💡 JEE Standard Values:
-• sin 0° = 0, sin 30° = 1/2, sin 45° = √2/2, sin 60° = √3/2, sin 90° = 1
-• cos 0° = 1, cos 30° = √3/2, cos 45° = √2/2, cos 60° = 1/2, cos 90° = 0
-• tan 0° = 0, tan 30° = 1/√3, tan 45° = 1, tan 60° = √3
-
-🎓 Advanced Topics:
-• Inverse trigonometric functions
-• Trigonometric equations with multiple angles
-• Applications in vectors and complex numbers"""
+        return self.solution_template('trigonometry')
+
+    def solve_probability(self, question):
+        """Solve permutation, combination, factorial and binomial probability problems exactly"""
+        question = prepare(question)
+        try:
+            answer = combinatorics.evaluate(question.raw)
+        except combinatorics.OutOfRange as e:
+            return self.solution_template('probability').format(
+                kind=e.kind,
+                expression=e.expression,
+                steps=f"Step 1: Check the numbers: {e}",
+                answer=f"not defined ({e})"
+            )
+        except ValueError:
+            answer = None
+        
+        if answer is None:
+            return self.general_math_solution(question)
+        
+        return self.solution_template('probability').format(
+            kind=answer.kind,
+            expression=answer.expression,
+            steps='\n'.join(f"Step {i}: {step}" for i, step in enumerate(answer.steps, 1)),
+            answer=combinatorics.format_value(answer.value)
+        )
+
+    def solve_linear_algebra(self, question):
+        """Solve determinant, inverse, rank, linear system and dot/cross product problems exactly"""
+        question = prepare(question)
+        answer = linear_algebra.evaluate(question.raw)
+        
+        if answer is None:
+            return self.solve_probability(question)
+        
+        return self.solution_template('linear_algebra').format(
+            kind=linear_algebra.KIND_LABELS[answer.kind],
+            expression=answer.expression,
+            steps='\n'.join(f"Step {i}: {step}" for i, step in enumerate(answer.steps, 1)),
+            answer=linear_algebra.format_value(answer)
+        )
 
     def general_physics_solution(self, question):
-        return "🔬 PHYSICS PROBLEM - Apply fundamental principles, identify forces/energy, use appropriate equations, and verify units."
+        return self.solution_template('general_physics')
 
     def general_chemistry_solution(self, question):
-        return "⚗️ CHEMISTRY PROBLEM - Balance equations, identify reaction type, apply mole concepts, and check stoichiometry."
+        return self.solution_template('general_chemistry')
 
     def general_math_solution(self, question):
-        return "📊 MATHEMATICS PROBLEM - Identify the mathematical concept, apply relevant formulas, and solve step by step."
+        return self.solution_template('general_mathematics')
 
     def solve_question(self, question, subject):
         """Main solving function"""
@@ -518,6 +266,8 @@ Step 4: Find Solutions
             # Add some processing delay to simulate AI thinking
             time.sleep(random.uniform(1, 3))
             
+            # Preprocess once; every stage below reads from the prepared question
+            question = prepare(question, subject)
             topic = self.identify_topic(question, subject)
             
             if subject == 'physics':
@@ -551,54 +301,256 @@ Step 4: Find Solutions
 # Initialize the JEE Solver
 solver = JEESolver()
 
+# In process mode each pool worker builds its own JEESolver once at startup.
+# The pool is never created at import: under gunicorn's preload_app the import runs in the
+# master, and an executor does not survive fork. Each process builds its own on first use.
+_solver_pool = None
+_solver_pool_pid = None
+_solver_pool_lock = threading.Lock()
+
+def get_solver_pool():
+    """This process's solver pool in process mode (None otherwise), created after any fork"""
+    global _solver_pool, _solver_pool_pid
+    if app.config['EXECUTOR'] != 'process':
+        return None
+    if _solver_pool_pid != os.getpid():
+        with _solver_pool_lock:
+            if _solver_pool_pid != os.getpid():
+                _solver_pool = SolverPool(JEESolver,
+                                          max_workers=app.config['POOL_WORKERS'],
+                                          max_queue=app.config['POOL_QUEUE'],
+                                          timeout=app.config['SOLVE_TIMEOUT'])
+                _solver_pool.warm()
+                _solver_pool_pid = os.getpid()
+    return _solver_pool
+
+# Identical questions arriving together are solved once and share the result
+inflight = SingleFlight()
+
+# As-you-type classification state, one incremental classifier per client session
+classifier_sessions = ClassifierSessions(solver.topic_tables)
+
+# Solution templates JEESolver uses, with the placeholders it fills in
+SOLUTION_TEMPLATES = {
+    **{name: frozenset() for name in ('kinematics', 'energy', 'circuits', 'solutions', 'stoichiometry',
+                                      'acid_base', 'calculus', 'integration', 'trigonometry',
+                                      'general_physics', 'general_chemistry', 'general_mathematics')},
+    'probability': frozenset({'kind', 'expression', 'steps', 'answer'}),
+    'linear_algebra': frozenset({'kind', 'expression', 'steps', 'answer'}),
+    'definite_integral': frozenset({'expression', 'answer', 'details'}),
+    'limit': frozenset({'expression', 'answer'})
+}
+
+def _recycle_solver_pool(knowledge_base):
+    """Pool workers hold the old content: move new requests to workers forked from this process"""
+    if _solver_pool_pid != os.getpid():
+        return {'solver_pool': 'none'}
+    _solver_pool.recycle()
+    return {'solver_pool': 'recycled'}
+
+# Knowledge base and solution templates reload on SIGHUP or POST /admin/reload, in this process
+# and its solver pool. Under gunicorn, send HUP to the master instead: gunicorn.conf.py
+# reloads there and every worker is replaced with the new content.
+reloader = KnowledgeBaseReloader(required_templates=SOLUTION_TEMPLATES, on_change=_recycle_solver_pool)
+validate_templates(get_knowledge_base(), SOLUTION_TEMPLATES)
+
+def _reload_on_sighup(signum, frame):
+    reloader.reload_async()
+
+try:
+    signal.signal(signal.SIGHUP, _reload_on_sighup)
+except (AttributeError, ValueError):
+    # No SIGHUP on this platform, or not imported from the main thread
+    pass
+
+# Opt-in per-request profiling (JEE_PROFILE, or X-Profile with the admin token), rate limited
+request_profiler = get_request_profiler()
+
+def is_admin(token):
+    """Constant-time check of an admin token against JEE_ADMIN_TOKEN"""
+    expected = app.config['ADMIN_TOKEN']
+    return bool(expected) and bool(token) and hmac.compare_digest(token, expected)
+
+def profile_requested(header_value, token):
+    """X-Profile is honoured only while JEE_PROFILE is on, or from a caller with the admin token"""
+    return wants_profile(header_value) and (request_profiler.enabled or is_admin(token))
+
+def run_solver(question, subject):
+    """Solve on the configured executor"""
+    pool = get_solver_pool()
+    if pool is not None:
+        return pool.submit('solve_question', question, subject)
+    return solver.solve_question(question, subject)
+
 # Routes
 @app.route('/')
 def home():
     """Serve the main JEE AI Solver page"""
     return render_template('index.html')
 
-@app.route('/solve', methods=['POST'])
-def solve_question():
-    """Main API endpoint for solving JEE questions"""
+def handle_solve(data, profile=False):
+    """
+    The /solve contract, independent of the web framework
+    `profile` asks for this request to be profiled (still subject to the rate limit)
+    Returns: (payload, status, headers)
+    """
     try:
-        data = request.get_json()
-        
         if not data or 'question' not in data:
-            return jsonify({
+            return {
                 'success': False,
                 'error': 'No question provided'
-            }), 400
+            }, 400, {}
         
         question = data['question'].strip()
         subject = data.get('subject', 'physics').lower()
         
         if not question:
-            return jsonify({
+            return {
                 'success': False,
                 'error': 'Question cannot be empty'
-            }), 400
+            }, 400, {}
         
         if subject not in ['physics', 'chemistry', 'mathematics']:
-            return jsonify({
+            return {
                 'success': False,
                 'error': 'Invalid subject. Choose from: physics, chemistry, mathematics'
-            }), 400
+            }, 400, {}
         
         # Solve the question using our custom AI
-        result = solver.solve_question(question, subject)
+        question = prepare(question, subject)
+        session = request_profiler.begin(question.raw, subject, requested=profile)
+        result = None
+        try:
+            result = inflight.do(question.key, run_solver, question, subject)
+        finally:
+            if session is not None:
+                request_profiler.end(session, result)
         
-        return jsonify(result)
+        return result, 200, {}
         
-    except Exception as e:
-        return jsonify({
+    except PoolSaturated as e:
+        return {
             'success': False,
-            'error': f'Server error: {str(e)}'
-        }), 500
-
-@app.route('/api/stats')
-def get_stats():
-    """Get application statistics"""
-    return jsonify({
+            'error': 'Server is busy, please try again shortly'
+        }, 429, {'Retry-After': str(e.retry_after)}
+        
+    except PoolTimeout as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }, 504, {}
+        
+    except Exception as e:
+        return server_error_payload(e), 500, {}
+
+def handle_classify(data):
+    """
+    The /classify contract: apply newly typed text to a session's running scores
+    Request: {"session": token?, "offset": int, "text": str, "subject": str?}
+    `text` replaces everything from `offset` on, so appends and edits both work.
+    Offsets and lengths count Unicode code points, not UTF-16 units.
+    Returns: (payload, status, headers)
+    """
+    try:
+        if not isinstance(data, dict):
+            return {'success': False, 'error': 'Request body must be a JSON object'}, 400, {}
+        if not isinstance(data.get('text', ''), str):
+            return {'success': False, 'error': 'No text provided'}, 400, {}
+        
+        offset = int(data.get('offset', 0))
+        if offset < 0:
+            return {'success': False, 'error': 'Offset cannot be negative'}, 400, {}
+        
+        token, classifier = classifier_sessions.get(data.get('session'))
+        with classifier.lock:
+            try:
+                classifier.update(offset, data.get('text', ''))
+            except OutOfSync as e:
+                # Unknown/expired session or lost update: client resends from e.length
+                return {
+                    'success': False,
+                    'session': token,
+                    'length': e.length,
+                    'error': str(e)
+                }, 409, {}
+            result = classifier.result()
+        
+        selected = data.get('subject')
+        if selected in classifier.topic_tables:
+            result['topic'] = result['topics'][selected]
+        
+        result.update({'success': True, 'session': token})
+        return result, 200, {}
+        
+    except (TypeError, ValueError) as e:
+        return {'success': False, 'error': f'Invalid request: {str(e)}'}, 400, {}
+
+def handle_admin_reload(token, method):
+    """
+    The /admin/reload contract: POST starts a background reload, GET reports status
+    Reloads the process that serves the request and its solver pool (its pid is in the payload)
+    Returns: (payload, status, headers)
+    """
+    if not is_admin(token):
+        return {'success': False, 'error': 'Admin access denied'}, 403, {}
+    
+    if method == 'POST':
+        started = reloader.reload_async()
+        payload = reloader.status()
+        payload.update({'success': True, 'started': started, 'pid': os.getpid()})
+        return payload, 202, {}
+    
+    payload = reloader.status()
+    payload.update({'success': True, 'pid': os.getpid()})
+    return payload, 200, {}
+
+def handle_admin_profiles(token, profile_id=None):
+    """
+    The /admin/profiles contract: list the slowest profiled requests, or download one
+    as collapsed stacks (flamegraph.pl / speedscope input)
+    Returns: (payload, status, headers) - payload is text for a download
+    """
+    if not is_admin(token):
+        return {'success': False, 'error': 'Admin access denied'}, 403, {}
+    
+    if profile_id is None:
+        return {
+            'success': True,
+            'profiling': request_profiler.stats(),
+            'profiles': request_profiler.list()
+        }, 200, {}
+    
+    path = request_profiler.folded_path(profile_id)
+    if path is None:
+        return {'success': False, 'error': 'Profile not found'}, 404, {}
+    
+    with open(path, encoding='utf-8') as f:
+        folded = f.read()
+    return folded, 200, {
+        'Content-Type': 'text/plain; charset=utf-8',
+        'Content-Disposition': f'attachment; filename="{profile_id}.folded"'
+    }
+
+def server_error_payload(error):
+    return {
+        'success': False,
+        'error': f'Server error: {str(error)}'
+    }
+
+def body_too_large_payload():
+    return {
+        'success': False,
+        'error': f'Request body too large (limit {MAX_BODY_BYTES} bytes)'
+    }
+
+def stats_payload():
+    """Application statistics served at /api/stats"""
+    return {
+        'executor': app.config['EXECUTOR'],
+        'solver_pool': _solver_pool.stats() if _solver_pool_pid == os.getpid() else None,
+        'coalescing': inflight.stats(),
+        'profiling': request_profiler.stats(),
+        'content_version': get_knowledge_base().fingerprint,
         'total_subjects': 3,
         'subjects': ['Physics', 'Chemistry', 'Mathematics'],
         'features': [
@@ -609,23 +561,74 @@ def get_stats():
             'Concept reviews'
         ],
         'status': 'online'
-    })
+    }
 
-@app.route('/health')
-def health_check():
-    """Health check endpoint"""
-    return jsonify({
+def health_payload():
+    """Health check served at /health"""
+    return {
         'status': 'healthy',
         'service': 'JEE AI Solver',
         'version': '1.0.0',
         'ai_model': 'Custom JEE Solver v1.0'
-    })
+    }
+
+@app.route('/solve', methods=['POST'])
+def solve_question():
+    """Main API endpoint for solving JEE questions"""
+    try:
+        data = request.get_json()
+    except RequestEntityTooLarge:
+        return jsonify(body_too_large_payload()), 413
+    except Exception as e:
+        return jsonify(server_error_payload(e)), 500
+    
+    profile = profile_requested(request.headers.get('X-Profile'), request.headers.get('X-Admin-Token'))
+    payload, status, headers = handle_solve(data, profile)
+    return jsonify(payload), status, headers
+
+@app.route('/classify', methods=['POST'])
+def classify_question():
+    """Lightweight incremental subject/topic classification while typing"""
+    # Malformed JSON arrives as None and gets a 400 from handle_classify
+    data = request.get_json(silent=True)
+    payload, status, headers = handle_classify(data)
+    return jsonify(payload), status, headers
+
+@app.route('/admin/reload', methods=['GET', 'POST'])
+def admin_reload():
+    """Hot-reload the knowledge base and solution templates without a restart"""
+    payload, status, headers = handle_admin_reload(request.headers.get('X-Admin-Token'), request.method)
+    return jsonify(payload), status, headers
+
+@app.route('/admin/profiles')
+@app.route('/admin/profiles/<profile_id>')
+def admin_profiles(profile_id=None):
+    """List the slowest profiled requests, or download one as collapsed stacks"""
+    payload, status, headers = handle_admin_profiles(request.headers.get('X-Admin-Token'), profile_id)
+    if isinstance(payload, str):
+        return payload, status, headers
+    return jsonify(payload), status, headers
+
+@app.route('/api/stats')
+def get_stats():
+    """Get application statistics"""
+    return jsonify(stats_payload())
+
+@app.route('/health')
+def health_check():
+    """Health check endpoint"""
+    return jsonify(health_payload())
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
     return jsonify({'error': 'Endpoint not found'}), 404
 
+@app.errorhandler(413)
+def body_too_large(error):
+    """Handle request bodies over MAX_CONTENT_LENGTH"""
+    return jsonify(body_too_large_payload()), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
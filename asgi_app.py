@@ -0,0 +1,158 @@
+# JEE AI Solver - asyncio/ASGI serving variant
+# Same /solve, /api/stats and /health contracts as app.py, but idle and slow
+# connections cost a coroutine instead of a thread.
+# Usage: uvicorn asgi_app:app --port 8000   (or: python asgi_app.py)
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app import (handle_solve, handle_classify, handle_admin_reload, handle_admin_profiles, stats_payload,
+                 health_payload, server_error_payload, body_too_large_payload, profile_requested,
+                 MAX_BODY_BYTES)
+
+# Blocking solver work runs here; connections themselves never hold a thread
+SOLVE_THREADS = int(os.environ.get('JEE_ASGI_THREADS', 32))
+solve_executor = ThreadPoolExecutor(max_workers=SOLVE_THREADS, thread_name_prefix='jee-solve')
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'index.html')
+
+
+class BodyTooLarge(Exception):
+    """Request body over MAX_BODY_BYTES (answered with 413, like the Flask app)"""
+
+
+async def read_body(receive):
+    """Collect the request body, refusing anything larger than MAX_BODY_BYTES"""
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY_BYTES:
+            raise BodyTooLarge()
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def send_response(send, status, body, content_type='application/json', headers=None):
+    raw_headers = [
+        (b'content-type', content_type.encode()),
+        (b'content-length', str(len(body)).encode())
+    ]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode(), str(value).encode()))
+
+    await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, payload, status=200, headers=None):
+    await send_response(send, status, json.dumps(payload).encode(), headers=headers)
+
+
+async def solve(receive, send, profile=False):
+    """POST /solve - blocking solve offloaded to the executor"""
+    try:
+        body = await read_body(receive)
+        if body is None:
+            return
+        data = json.loads(body) if body else None
+    except BodyTooLarge:
+        await send_json(send, body_too_large_payload(), 413)
+        return
+    except Exception as e:
+        await send_json(send, server_error_payload(e), 500)
+        return
+
+    loop = asyncio.get_running_loop()
+    # The profiler samples the executor thread that runs handle_solve
+    payload, status, headers = await loop.run_in_executor(solve_executor, handle_solve, data, profile)
+    await send_json(send, payload, status, headers)
+
+
+async def classify(receive, send):
+    """POST /classify - cheap enough to answer on the event loop"""
+    try:
+        body = await read_body(receive)
+        if body is None:
+            return
+    except BodyTooLarge:
+        await send_json(send, body_too_large_payload(), 413)
+        return
+    except Exception as e:
+        await send_json(send, server_error_payload(e), 500)
+        return
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        # Malformed JSON gets a 400 from handle_classify, like any other non-object body
+        data = None
+
+    payload, status, headers = handle_classify(data)
+    await send_json(send, payload, status, headers)
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                solve_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] != 'http':
+        return
+
+    path, method = scope['path'], scope['method']
+    request_headers = dict(scope['headers'])
+
+    if path == '/solve' and method == 'POST':
+        profile = profile_requested(request_headers.get(b'x-profile', b'').decode(),
+                                    request_headers.get(b'x-admin-token', b'').decode())
+        await solve(receive, send, profile)
+    elif path == '/classify' and method == 'POST':
+        await classify(receive, send)
+    elif path == '/admin/reload' and method in ('GET', 'POST'):
+        token = request_headers.get(b'x-admin-token', b'').decode()
+        payload, status, headers = handle_admin_reload(token, method)
+        await send_json(send, payload, status, headers)
+    elif (path == '/admin/profiles' or path.startswith('/admin/profiles/')) and method == 'GET':
+        token = request_headers.get(b'x-admin-token', b'').decode()
+        profile_id = path[len('/admin/profiles/'):] or None
+        payload, status, headers = handle_admin_profiles(token, profile_id)
+        if isinstance(payload, str):
+            headers = dict(headers)
+            content_type = headers.pop('Content-Type')
+            await send_response(send, status, payload.encode(), content_type=content_type, headers=headers)
+        else:
+            await send_json(send, payload, status, headers)
+    elif path == '/api/stats' and method == 'GET':
+        await send_json(send, stats_payload())
+    elif path == '/health' and method == 'GET':
+        await send_json(send, health_payload())
+    elif path == '/' and method == 'GET':
+        with open(INDEX_PATH, 'rb') as f:
+            await send_response(send, 200, f.read(), content_type='text/html; charset=utf-8')
+    elif path in ('/solve', '/classify', '/admin/reload', '/admin/profiles', '/api/stats', '/health', '/'):
+        await send_json(send, {'error': 'Method not allowed'}, 405)
+    else:
+        await send_json(send, {'error': 'Endpoint not found'}, 404)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 8000))
+
+    print("🚀 Starting JEE AI Solver (asyncio)...")
+    print(f"🔗 Access at: http://localhost:{port}")
+
+    uvicorn.run(app, host='0.0.0.0', port=port, log_level='warning')
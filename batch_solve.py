@@ -0,0 +1,308 @@
+# Offline batch solver: JSONL questions in, JSONL solutions out, spread across processes
+#
+# Each input line is a JSON object: {"question": "...", "subject": "physics", "id": ...}
+# ("subject" and "id" are optional). Each output line carries the input line number,
+# the id if given, and the solver's result.
+#
+# The backend is loaded once in the parent and shared by the forked workers. Input is read
+# in chunks: mathematics questions the exact engines recognize (integrals and limits,
+# matrices and linear systems, nPr/nCr/binomial) are answered in the parent, one
+# evaluate_batch call per engine per chunk, and only the rest go to the backend workers.
+#
+# Usage:
+#   python batch_solve.py questions.jsonl -o solutions.jsonl --workers 8 --checkpoint run.ckpt
+#   cat questions.jsonl | python batch_solve.py - --unordered > solutions.jsonl
+
+import argparse
+import contextlib
+import gc
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import combinatorics
+import linear_algebra
+import numeric_calculus
+
+BACKENDS = {
+    # JEEWebSolver.get_solution(question, subject) - the model-backed solver
+    'model': ('jee_ai_model', 'JEEWebSolver', 'get_solution'),
+    # JEESolver.solve_question(question, subject) - the solver behind app.py's /solve
+    'web': ('app', 'JEESolver', 'solve_question')
+}
+
+# Exact engines tried, in this order, on mathematics questions before the backend
+ENGINES = ('numeric_calculus', 'linear_algebra', 'combinatorics')
+
+# Solver owned by each worker process
+_worker_solve = None
+
+
+def preload_backend(backend: str):
+    """
+    Load the backend in the parent before the pool forks, so workers share its pages
+    Same recipe as gunicorn.conf.py: collector off while loading, then freeze
+    Loading messages go to stderr, away from JSONL written to stdout
+    """
+    module_name, _, _ = BACKENDS[backend]
+    gc.disable()
+    with contextlib.redirect_stdout(sys.stderr):
+        module = importlib.import_module(module_name)
+        if backend == 'model':
+            module.preload()
+    gc.collect()
+    gc.freeze()
+    gc.enable()
+
+
+def _init_worker(backend: str):
+    """Build the backend solver once per worker; keep its prints off the JSONL stream"""
+    global _worker_solve
+    gc.enable()
+    sys.stdout = sys.stderr
+    module_name, class_name, method = BACKENDS[backend]
+    module = importlib.import_module(module_name)
+    _worker_solve = getattr(getattr(module, class_name)(), method)
+
+
+def _solve_line(line_no: int, line: str) -> dict:
+    """Solve one input line; bad input becomes an error record instead of stopping the run"""
+    try:
+        record = json.loads(line)
+        question = record['question']
+        result = _worker_solve(question, record.get('subject', 'physics'))
+        output = {'line': line_no, 'id': record.get('id')}
+        output.update(result)
+        return output
+    except Exception as e:
+        return {'line': line_no, 'success': False, 'error': f"{type(e).__name__}: {e}"}
+
+
+def _evaluate(engine, questions: list) -> list:
+    """engine.evaluate_batch, falling back to one at a time if a question makes the batch raise"""
+    try:
+        return engine.evaluate_batch(questions)
+    except Exception:
+        answers = []
+        for question in questions:
+            try:
+                answers.append(engine.evaluate(question))
+            except Exception:
+                # e.g. combinatorics.OutOfRange: the backend explains it
+                answers.append(None)
+        return answers
+
+
+def _engine_output(line_no: int, record: dict, engine: str, answer) -> dict:
+    """An exact engine's answer in the backend's output shape"""
+    if engine == 'numeric_calculus':
+        topic = 'Integration' if answer.kind == 'integral' else 'Calculus'
+        shown, steps = numeric_calculus.format_estimate(answer), [answer.note] if answer.note else []
+    elif engine == 'linear_algebra':
+        topic, shown, steps = 'Linear Algebra', linear_algebra.format_value(answer), list(answer.steps)
+    else:
+        topic, shown, steps = 'Probability', combinatorics.format_value(answer.value), list(answer.steps)
+    return {
+        'line': line_no,
+        'id': record.get('id'),
+        'success': True,
+        'solution': '\n'.join([answer.expression, *steps, f"Answer: {shown}"]),
+        'answer': shown,
+        'topic': topic,
+        'engine': engine,
+        'confidence': 1.0
+    }
+
+
+def answer_with_engines(chunk: list) -> list:
+    """
+    Outputs for a chunk of (line_no, line), in order, with None for lines the backend must solve
+    Recognized mathematics questions are answered per engine in one evaluate_batch call
+    """
+    outputs = [None] * len(chunk)
+    pending = []
+    for i, (line_no, line) in enumerate(chunk):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # the backend path reports it
+        if isinstance(record, dict) and record.get('subject') == 'mathematics' \
+                and isinstance(record.get('question'), str):
+            pending.append((i, line_no, record))
+
+    for name in ENGINES:
+        if not pending:
+            break
+        engine = globals()[name]
+        answers = _evaluate(engine, [record['question'] for _, _, record in pending])
+        unanswered = []
+        for entry, answer in zip(pending, answers):
+            if answer is None:
+                unanswered.append(entry)
+            else:
+                i, line_no, record = entry
+                outputs[i] = _engine_output(line_no, record, name, answer)
+        pending = unanswered
+    return outputs
+
+
+def read_checkpoint(path: str) -> set:
+    """Line numbers already written by a previous run"""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {int(line) for line in f if line.strip()}
+
+
+def read_input(stream, done: set):
+    """Yield (line_no, line) lazily, skipping blank and already-solved lines"""
+    for line_no, line in enumerate(stream, 1):
+        if line.strip() and line_no not in done:
+            yield line_no, line
+
+
+def read_chunks(stream, done: set, size: int):
+    """Yield lists of up to `size` (line_no, line) pairs"""
+    chunk = []
+    for item in read_input(stream, done):
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ProgressReporter:
+    """Throughput report on stderr every `interval` seconds"""
+
+    def __init__(self, interval: float, skipped: int):
+        self.interval = interval
+        self.skipped = skipped
+        self.start = time.perf_counter()
+        self.last_report = self.start
+        self.solved = 0
+        self.failed = 0
+
+    def record(self, output: dict):
+        self.solved += 1
+        if not output.get('success', False):
+            self.failed += 1
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def report(self, final: bool = False):
+        elapsed = time.perf_counter() - self.start
+        rate = self.solved / elapsed if elapsed > 0 else 0.0
+        label = "✅ Done" if final else "⏳ Progress"
+        print(f"{label}: {self.solved} solved ({self.failed} failed, {self.skipped} resumed) "
+              f"in {elapsed:.1f}s - {rate:.2f} questions/s", file=sys.stderr, flush=True)
+
+
+def run(args):
+    done = read_checkpoint(args.checkpoint)
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    if args.output == '-':
+        sink = sys.stdout
+    else:
+        sink = open(args.output, 'a' if done else 'w', encoding='utf-8')
+    checkpoint = open(args.checkpoint, 'a') if args.checkpoint else None
+    progress = ProgressReporter(args.progress_interval, skipped=len(done))
+
+    def write(output):
+        sink.write(json.dumps(output, ensure_ascii=False) + '\n')
+        sink.flush()
+        # Only checkpoint once the result is safely in the output
+        if checkpoint:
+            checkpoint.write(f"{output['line']}\n")
+            checkpoint.flush()
+        progress.record(output)
+
+    def dispatch(executor):
+        """Yield each line's output (engines) or backend future, in input order"""
+        for chunk in read_chunks(source, done, args.chunk_size):
+            outputs = [None] * len(chunk) if args.backend_only else answer_with_engines(chunk)
+            for (line_no, line), output in zip(chunk, outputs):
+                yield output if output is not None else executor.submit(_solve_line, line_no, line)
+
+    # At most `window` lines are in flight, so memory stays flat on any input size
+    window = args.workers * args.window_per_worker
+
+    preload_backend(args.backend)
+    # Forked workers share the preloaded backend; elsewhere each worker loads its own
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(args.backend,)) as executor:
+            if args.unordered:
+                pending = set()
+                for item in dispatch(executor):
+                    if isinstance(item, dict):
+                        write(item)
+                        continue
+                    pending.add(item)
+                    if len(pending) >= window:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            write(future.result())
+                for future in wait(pending).done:
+                    write(future.result())
+            else:
+                # Engine answers wait their turn behind earlier backend lines
+                pending = deque()
+                in_flight = 0
+                for item in dispatch(executor):
+                    pending.append(item)
+                    in_flight += not isinstance(item, dict)
+                    while pending and (isinstance(pending[0], dict) or in_flight >= window):
+                        head = pending.popleft()
+                        if not isinstance(head, dict):
+                            in_flight -= 1
+                            head = head.result()
+                        write(head)
+                while pending:
+                    head = pending.popleft()
+                    write(head if isinstance(head, dict) else head.result())
+    finally:
+        progress.report(final=True)
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        if checkpoint:
+            checkpoint.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Solve a JSONL question bank in parallel')
+    parser.add_argument('input', help="JSONL file of questions, or '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file (default: stdout)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='model',
+                        help='solver to run in each worker')
+    parser.add_argument('--unordered', action='store_true',
+                        help='write results as they finish instead of in input order')
+    parser.add_argument('--checkpoint', help='file recording solved line numbers; rerun to resume')
+    parser.add_argument('--chunk-size', type=int, default=64,
+                        help='lines read at a time and batched through the exact engines')
+    parser.add_argument('--window-per-worker', type=int, default=4,
+                        help='lines in flight per worker')
+    parser.add_argument('--backend-only', action='store_true',
+                        help='send every question to the backend, even ones the exact engines recognize')
+    parser.add_argument('--progress-interval', type=float, default=5.0,
+                        help='seconds between throughput reports on stderr')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run(parse_args())
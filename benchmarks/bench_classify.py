@@ -0,0 +1,69 @@
+# Latency of /classify updates while typing (target: p99 under 2 ms)
+# Replays a question keystroke-by-keystroke through app.handle_classify and compares
+# with rescanning the whole text on every keystroke.
+# Usage: python benchmarks/bench_classify.py [--paragraphs 5] [--sessions 20]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import solver, handle_classify
+from prepared_question import PreparedQuestion
+
+PARAGRAPH = (
+    "A particle moves with constant acceleration 2 m/s². If it travels 10 m in the first "
+    "2 seconds, find its initial velocity, the work done by the net force and the kinetic "
+    "energy gained. Then compute the derivative of its position function. "
+)
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[int(fraction * (len(samples) - 1))]
+
+
+def type_incrementally(question):
+    latencies = []
+    session, offset = None, 0
+    while offset < len(question):
+        chunk = question[offset:offset + random.randint(1, 4)]
+        start = time.perf_counter()
+        payload, status, _ = handle_classify({'session': session, 'offset': offset, 'text': chunk})
+        latencies.append(time.perf_counter() - start)
+        session = payload['session']
+        offset += len(chunk)
+    return latencies
+
+
+def type_with_full_rescan(question):
+    latencies = []
+    for end in range(1, len(question) + 1, 3):
+        start = time.perf_counter()
+        prepared = PreparedQuestion(question[:end])
+        prepared.features
+        for subject in solver.topic_tables:
+            solver.identify_topic(prepared, subject)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark incremental classification')
+    parser.add_argument('--paragraphs', type=int, default=5)
+    parser.add_argument('--sessions', type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    question = PARAGRAPH * args.paragraphs
+    print(f"📏 Question length: {len(question)} chars, {args.sessions} typing sessions")
+
+    for name, typer in (('incremental', type_incrementally), ('full rescan', type_with_full_rescan)):
+        latencies = []
+        for _ in range(args.sessions):
+            latencies.extend(typer(question))
+        print(f"⏱️ {name}: p50 {percentile(latencies, 0.5) * 1e6:.0f} µs, "
+              f"p99 {percentile(latencies, 0.99) * 1e6:.0f} µs over {len(latencies)} updates")
@@ -0,0 +1,57 @@
+# Solve-stage throughput of linear_algebra.solve_problems, one question at a time and batched
+# JEE questions use 2×2 to 4×4 matrices, which take the exact Fraction path either way; only
+# matrices above EXACT_MAX_SIZE are stacked into one NumPy call per (kind, shape) group, and
+# there the batch is only marginally faster than one call per question (1.1–1.2x at 10×10,
+# where parsing dominates). Both timings are reported; no speedup is claimed.
+# Parsing is timed separately since both pay it.
+# Usage: python benchmarks/bench_linear_algebra.py [--questions 2000] [--size 3]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import linear_algebra
+
+
+def matrix_text(size):
+    rows = ("[" + ", ".join(str(random.randint(-9, 9)) for _ in range(size)) + "]" for _ in range(size))
+    return "[" + ", ".join(rows) + "]"
+
+
+def make_questions(count, size):
+    questions = []
+    for _ in range(count):
+        kind = random.choice(('determinant', 'inverse'))
+        questions.append(f"Find the {kind} of the matrix {matrix_text(size)}")
+    return questions
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark batched linear algebra solving')
+    parser.add_argument('--questions', type=int, default=2000)
+    parser.add_argument('--size', type=int, default=3, help='matrix size (above EXACT_MAX_SIZE is batched)')
+    args = parser.parse_args()
+
+    random.seed(0)
+    questions = make_questions(args.questions, args.size)
+    print(f"🧮 {args.questions} questions, {args.size}×{args.size} matrices "
+          f"({'exact' if args.size <= linear_algebra.EXACT_MAX_SIZE else 'NumPy'} path)")
+
+    parsing, problems = timed(lambda qs: [linear_algebra.parse(q) for q in qs], questions)
+    one_by_one, _ = timed(lambda ps: [linear_algebra.solve_problems([p]) for p in ps], problems)
+    batched, answers = timed(linear_algebra.solve_problems, problems)
+    solved = sum(answer is not None and answer.value is not None for answer in answers)
+
+    print(f"📝 parsing: {parsing * 1000:.1f} ms")
+    print(f"⏱️ solve one at a time: {one_by_one * 1000:.1f} ms ({args.questions / one_by_one:.0f} q/s)")
+    print(f"⏱️ solve batched: {batched * 1000:.1f} ms ({args.questions / batched:.0f} q/s), {solved} solved")
@@ -0,0 +1,59 @@
+# Throughput of numeric_calculus.solve_problems: one question at a time vs batched
+# Batched integrals share each adaptive round, with one vectorized call per distinct
+# integrand; batched limits share one extrapolation tableau.
+# Usage: python benchmarks/bench_numeric_calculus.py [--questions 1200]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numeric_calculus
+
+INTEGRALS = [
+    "Evaluate the integral of x^{k} sin x dx from 0 to {b}",
+    "Integrate e^(-{k}x^2) dx from -∞ to ∞",
+    "Find ∫_0^{b} 1/(1 + {k}x^2) dx",
+    "Integrate x ln x dx from 1 to {b}",
+]
+LIMITS = [
+    "Find the limit of (1 - cos {k}x)/x^2 as x -> 0",
+    "Evaluate lim x→inf (1 + {k}/x)^x",
+    "Find lim x->0 (e^({k}x) - 1)/x",
+]
+
+
+def make_questions(count):
+    templates = INTEGRALS + LIMITS
+    return [random.choice(templates).format(k=random.randint(1, 6), b=random.randint(1, 4))
+            for _ in range(count)]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark batched integrals and limits')
+    parser.add_argument('--questions', type=int, default=1200)
+    args = parser.parse_args()
+
+    random.seed(0)
+    questions = make_questions(args.questions)
+    print(f"∫ {args.questions} integral and limit questions")
+
+    parsing, problems = timed(lambda qs: [numeric_calculus.parse(q) for q in qs], questions)
+    one_by_one, _ = timed(lambda ps: [numeric_calculus.solve_problems([p]) for p in ps], problems)
+    batched, estimates = timed(numeric_calculus.solve_problems, problems)
+    converged = sum(e is not None and e.converged for e in estimates)
+
+    print(f"📝 parsing: {parsing * 1000:.1f} ms")
+    print(f"⏱️ solve one at a time: {one_by_one * 1000:.1f} ms ({args.questions / one_by_one:.0f} q/s)")
+    print(f"⏱️ solve batched: {batched * 1000:.1f} ms ({args.questions / batched:.0f} q/s), "
+          f"{converged} converged")
+    print(f"🚀 Speedup: {one_by_one / batched:.2f}x")
@@ -0,0 +1,99 @@
+# Per-request CPU of the preprocessing pipeline: one-pass PreparedQuestion vs
+# the previous per-stage rescans (question.lower() / extract_numbers in each stage)
+# Usage: python benchmarks/bench_prepared_question.py [--paragraphs 20] [--runs 2000]
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import JEESolver
+from prepared_question import prepare, SUBJECT_KEYWORDS
+
+PARAGRAPH = (
+    "A block of mass 5 kg rests on a rough incline of angle 30 degrees with coefficient of "
+    "friction 0.25. A force of 40 N is applied parallel to the incline for 4 s, after which the "
+    "block moves freely. Find the acceleration during the push, the velocity at 4 s, the work "
+    "done against friction and the total distance travelled before it comes to rest.\n\n"
+)
+
+NUMBER_PATTERN = r'-?\d+\.?\d*(?:[eE][+-]?\d+)?'
+
+
+def legacy_extract_numbers(text):
+    numbers = []
+    for match in re.finditer(NUMBER_PATTERN, text):
+        try:
+            numbers.append(float(match.group()))
+        except ValueError:
+            continue
+    return numbers
+
+
+def legacy_web_pipeline(solver, question, subject):
+    """app.JEESolver stages as they were: each one lowers the question again"""
+    question_lower = question.lower()
+    for pattern in solver.physics_patterns:
+        if re.search(pattern, question_lower):
+            break
+    question_lower = question.lower()
+    return any(word in question_lower for word in ['velocity', 'acceleration', 'motion', 'distance', 'time'])
+
+
+def prepared_web_pipeline(solver, question, subject):
+    prepared = prepare(question, subject)
+    solver.identify_topic(prepared, subject)
+    return prepared.mentions('velocity', 'acceleration', 'motion', 'distance', 'time')
+
+
+def legacy_model_pipeline(question):
+    """Replica of jee_ai_model.JEEProblemSolver's stages as they were (chemistry route, the worst case)"""
+    question_lower = question.lower()
+    scores = {s: sum(1 for kw in kws if kw in question_lower) for s, kws in SUBJECT_KEYWORDS.items()}
+    'motion' in question_lower or 'velocity' in question_lower
+    legacy_extract_numbers(question)
+    'molarity' in question.lower() or 'concentration' in question.lower()
+    'balance' in question.lower() or 'equation' in question.lower()
+    legacy_extract_numbers(question)
+    return scores
+
+
+def prepared_model_pipeline(question):
+    """The same replica stages on one PreparedQuestion (the real class needs torch to import)"""
+    prepared = prepare(question)
+    scores = prepared.features
+    prepared.mentions('motion', 'velocity')
+    prepared.quantities
+    prepared.mentions('molarity', 'concentration')
+    prepared.mentions('balance', 'equation')
+    prepared.quantities
+    return scores
+
+
+def cpu_per_call(fn, args, runs):
+    start = time.process_time()
+    for _ in range(runs):
+        fn(*args)
+    return (time.process_time() - start) / runs * 1e6
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark one-pass question preprocessing')
+    parser.add_argument('--paragraphs', type=int, default=20)
+    parser.add_argument('--runs', type=int, default=2000)
+    args = parser.parse_args()
+
+    question = PARAGRAPH * args.paragraphs
+    solver = JEESolver()
+
+    print(f"📏 Question length: {len(question)} chars")
+    for name, legacy, prepared, call_args in (
+        ('web (app.JEESolver)', legacy_web_pipeline, prepared_web_pipeline, (solver, question, 'physics')),
+        ('model-style stages (JEEProblemSolver replica)', legacy_model_pipeline, prepared_model_pipeline, (question,))
+    ):
+        before = cpu_per_call(legacy, call_args, args.runs)
+        after = cpu_per_call(prepared, call_args, args.runs)
+        print(f"⏱️ {name}: {before:.1f} µs -> {after:.1f} µs per request ({before / after:.2f}x)")
@@ -0,0 +1,138 @@
+# Load comparison: Flask (app.py) vs asyncio/ASGI (asgi_app.py)
+# Holds many slow, idle client connections open, then measures /solve latency
+# and server memory/threads under that load.
+# Usage: python benchmarks/compare_servers.py [--idle 500] [--concurrency 50]
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    'flask': [sys.executable, 'app.py'],
+    'asgi': [sys.executable, 'asgi_app.py']
+}
+
+QUESTIONS = [
+    ("A car accelerates from rest at 2 m/s² for 10 s. Find its final velocity.", 'physics'),
+    ("Calculate the molarity of 40g NaOH in 500 mL solution.", 'chemistry'),
+    ("Find the derivative of x³ + 2x² - 5x + 1", 'mathematics')
+]
+
+
+def start_server(name, port):
+    env = dict(os.environ, PORT=str(port), FLASK_DEBUG='false')
+    process = subprocess.Popen(SERVERS[name], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{name} server did not start on port {port}")
+
+
+def server_resources(pid):
+    """RSS and thread count of the server process from /proc"""
+    fields = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            fields[key] = value.strip()
+    return {
+        'rss_mb': round(int(fields['VmRSS'].split()[0]) / 1024, 1),
+        'threads': int(fields['Threads'])
+    }
+
+
+def open_idle_connections(port, count):
+    """Slow clients: send half a request and then go quiet"""
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(b'GET /health HTTP/1.1\r\nHost: localhost\r\n')
+        sockets.append(sock)
+    return sockets
+
+
+def timed_solve(port, question, subject, latencies, errors):
+    start = time.perf_counter()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        conn.request('POST', '/solve', body=json.dumps({'question': question, 'subject': subject}),
+                     headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            errors.append(response.status)
+    except OSError as e:
+        errors.append(str(e))
+    latencies.append(time.perf_counter() - start)
+
+
+def run(name, port, idle, concurrency):
+    process = start_server(name, port)
+    try:
+        baseline = server_resources(process.pid)
+        sockets = open_idle_connections(port, idle)
+        time.sleep(0.5)
+        with_idle = server_resources(process.pid)
+
+        latencies, errors = [], []
+        threads = [
+            threading.Thread(target=timed_solve, args=(port, *QUESTIONS[i % len(QUESTIONS)], latencies, errors))
+            for i in range(concurrency)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        under_load = server_resources(process.pid)
+
+        for sock in sockets:
+            sock.close()
+
+        latencies.sort()
+        return {
+            'idle_connections': idle,
+            'concurrent_solves': concurrency,
+            'errors': len(errors),
+            'throughput_rps': round(concurrency / elapsed, 2),
+            'p50_ms': round(statistics.median(latencies) * 1000, 1),
+            'p99_ms': round(latencies[int(0.99 * (len(latencies) - 1))] * 1000, 1),
+            'baseline': baseline,
+            'with_idle_connections': with_idle,
+            'under_load': under_load
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare Flask and ASGI servers under load')
+    parser.add_argument('--idle', type=int, default=500, help='slow client connections to hold open')
+    parser.add_argument('--concurrency', type=int, default=50, help='concurrent /solve requests')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    report = {
+        name: run(name, args.port + offset, args.idle, args.concurrency)
+        for offset, name in enumerate(SERVERS)
+    }
+    print(json.dumps(report, indent=2))
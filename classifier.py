@@ -0,0 +1,153 @@
+# Incremental as-you-type question classification
+# Scores are updated from the newly typed text only, never by rescanning the whole question
+
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from prepared_question import SUBJECT_KEYWORDS
+
+MAX_TEXT_LENGTH = 20000
+
+
+class OutOfSync(Exception):
+    """The client's offset is past the end of the text the server holds"""
+
+    def __init__(self, length: int):
+        super().__init__(f"Offset is beyond the {length} characters received so far")
+        self.length = length
+
+
+def fold_case(text: str) -> str:
+    """
+    Lowercase without changing the length, so offsets into the folded text stay valid
+    ('İ'.lower() is two code points; such characters are kept as they are)
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def _longest_match(pattern: str) -> int:
+    """Longest literal alternative of a simple `a|b|c` keyword pattern"""
+    return max(len(part) for part in pattern.split('|'))
+
+
+class IncrementalClassifier:
+    """
+    Running subject/topic state for one question being typed
+    Same scoring as JEEProblemSolver.identify_problem_type (subject) and
+    JEESolver.identify_topic (topic), kept as sets of matches seen so far
+    """
+
+    def __init__(self, topic_tables: Dict[str, Tuple[List[str], List[str]]]):
+        self.topic_tables = topic_tables
+        self.compiled = {
+            subject: [re.compile(pattern) for pattern in patterns]
+            for subject, (patterns, _) in topic_tables.items()
+        }
+        # A match ending in new text starts at most this many characters before it
+        self.overlap = max(
+            [len(kw) for kws in SUBJECT_KEYWORDS.values() for kw in kws] +
+            [_longest_match(p) for patterns, _ in topic_tables.values() for p in patterns]
+        ) - 1
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.text = ''
+        self.keywords = {subject: set() for subject in SUBJECT_KEYWORDS}
+        self.topic_hits = {subject: set() for subject in self.topic_tables}
+
+    def update(self, offset: int, delta: str):
+        """Replace everything from `offset` (in code points, like len()) on with `delta`"""
+        if offset > len(self.text):
+            raise OutOfSync(len(self.text))
+
+        if offset < len(self.text):
+            # Text was edited rather than appended to: rebuild from the kept prefix
+            kept = self.text[:offset]
+            self.reset()
+            self._scan(kept, 0)
+
+        delta = fold_case(delta)[:MAX_TEXT_LENGTH - offset]
+        start = max(0, offset - self.overlap)
+        self._scan(self.text[start:offset] + delta, start)
+
+    def _scan(self, region: str, start: int):
+        self.text = self.text[:start] + region
+
+        for subject, keywords in SUBJECT_KEYWORDS.items():
+            found = self.keywords[subject]
+            for kw in keywords:
+                if kw not in found and kw in region:
+                    found.add(kw)
+
+        for subject, patterns in self.compiled.items():
+            hits = self.topic_hits[subject]
+            for i, pattern in enumerate(patterns):
+                if i not in hits and pattern.search(region):
+                    hits.add(i)
+
+    def subject_scores(self) -> Dict[str, int]:
+        return {subject: len(found) for subject, found in self.keywords.items()}
+
+    def subject(self) -> str:
+        """Most likely subject, with identify_problem_type's tie-breaking"""
+        scores = self.subject_scores()
+        if scores['physics'] >= scores['chemistry'] and scores['physics'] >= scores['mathematics']:
+            return 'physics'
+        elif scores['chemistry'] >= scores['mathematics']:
+            return 'chemistry'
+        return 'mathematics'
+
+    def topic(self, subject: str) -> str:
+        """First matching topic, as identify_topic would report it"""
+        hits = self.topic_hits[subject]
+        if hits:
+            return self.topic_tables[subject][1][min(hits)]
+        return f"{subject.title()} Problem"
+
+    def result(self) -> Dict:
+        subject = self.subject()
+        return {
+            'length': len(self.text),
+            'subject': subject,
+            'subject_scores': self.subject_scores(),
+            'topic': self.topic(subject),
+            'topics': {s: self.topic(s) for s in self.topic_tables}
+        }
+
+
+class ClassifierSessions:
+    """Bounded LRU of per-client classifiers that expire after `ttl` seconds idle"""
+
+    def __init__(self, topic_tables, max_sessions: int = 10000, ttl: float = 600):
+        self.topic_tables = topic_tables
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str = None) -> Tuple[str, IncrementalClassifier]:
+        """Return (token, classifier), starting a new session for unknown tokens"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(token) if token else None
+            if entry is None or now - entry[0] > self.ttl:
+                token = secrets.token_urlsafe(12)
+                classifier = IncrementalClassifier(self.topic_tables)
+            else:
+                classifier = entry[1]
+            self._sessions[token] = (now, classifier)
+            self._sessions.move_to_end(token)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return token, classifier
+
+    def __len__(self):
+        return len(self._sessions)
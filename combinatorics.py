@@ -0,0 +1,292 @@
+# Exact combinatorics and probability engine for the Probability topic
+# Parses nPr, nCr, factorial and binomial-probability questions and answers them exactly
+# (integers or Fractions), using a factorial table that grows on demand.
+
+import math
+import re
+import threading
+from collections import namedtuple
+from fractions import Fraction
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+# Factorials up to this size live in the table; larger arguments go through the LRU
+TABLE_LIMIT = 2000
+# Largest n accepted from question text (and number of binomial trials)
+MAX_ARGUMENT = 100000
+MAX_TRIALS = 1000
+# Exact values are printed in full up to this many digits (Python refuses str() past 4300)
+MAX_DIGITS = 3000
+
+_factorials = [1]
+_table_lock = threading.Lock()
+
+Answer = namedtuple('Answer', ['kind', 'expression', 'value', 'steps'])
+
+
+class OutOfRange(ValueError):
+    """A recognized question whose numbers are outside what it (or this engine) allows"""
+
+    def __init__(self, kind: str, expression: str, reason: str):
+        super().__init__(reason)
+        self.kind = kind
+        self.expression = expression
+
+
+def _grow_table(n: int):
+    """Extend the table to cover n (capped at TABLE_LIMIT)"""
+    n = min(n, TABLE_LIMIT)
+    if n < len(_factorials):
+        return
+    with _table_lock:
+        for i in range(len(_factorials), n + 1):
+            _factorials.append(_factorials[-1] * i)
+
+
+@lru_cache(maxsize=256)
+def _large_factorial(n: int) -> int:
+    return math.factorial(n)
+
+
+@lru_cache(maxsize=1024)
+def _large_comb(n: int, r: int) -> int:
+    return math.comb(n, r)
+
+
+@lru_cache(maxsize=1024)
+def _large_perm(n: int, r: int) -> int:
+    return math.perm(n, r)
+
+
+def factorial(n: int) -> int:
+    if n < 0:
+        raise ValueError("Factorial is not defined for negative numbers")
+    if n > TABLE_LIMIT:
+        return _large_factorial(n)
+    _grow_table(n)
+    return _factorials[n]
+
+
+def permutations(n: int, r: int) -> int:
+    """nPr = n! / (n-r)!"""
+    if not 0 <= r <= n:
+        raise ValueError(f"Need 0 ≤ r ≤ n for {n}P{r}")
+    if n > TABLE_LIMIT:
+        return _large_perm(n, r)
+    return factorial(n) // factorial(n - r)
+
+
+def combinations(n: int, r: int) -> int:
+    """nCr = n! / (r!(n-r)!)"""
+    if not 0 <= r <= n:
+        raise ValueError(f"Need 0 ≤ r ≤ n for {n}C{r}")
+    if n > TABLE_LIMIT:
+        return _large_comb(n, r)
+    return factorial(n) // (factorial(r) * factorial(n - r))
+
+
+def binomial_probability(n: int, k: int, p: Fraction, mode: str = 'exactly') -> Fraction:
+    """P(X = k), P(X ≥ k) or P(X ≤ k) for X ~ Binomial(n, p), exactly"""
+    if not 0 <= k <= n:
+        raise ValueError(f"Need 0 ≤ k ≤ n, got k={k}, n={n}")
+    if mode == 'at least':
+        ks = range(k, n + 1)
+    elif mode == 'at most':
+        ks = range(0, k + 1)
+    else:
+        ks = (k,)
+    q = 1 - p
+    return sum((combinations(n, i) * p ** i * q ** (n - i) for i in ks), Fraction(0))
+
+
+# --- Parsing -------------------------------------------------------------------------------
+
+NPR_PATTERN = re.compile(r'\b(\d+)\s?P\s?(\d+)\b|\bP\(\s*(\d+)\s*,\s*(\d+)\s*\)', re.IGNORECASE)
+NCR_PATTERN = re.compile(r'\b(\d+)\s?C\s?(\d+)\b|\bC\(\s*(\d+)\s*,\s*(\d+)\s*\)|\b(\d+)\s+choose\s+(\d+)\b',
+                         re.IGNORECASE)
+FACTORIAL_PATTERN = re.compile(r'\b(\d+)\s*!(?!=)|factorial\s+(?:of\s+)?(\d+)', re.IGNORECASE)
+SELECT_PATTERN = re.compile(
+    r'(choose|select|pick|arrange|permute)\w*\s+(\d+)\b.*?\b(?:from|out of|of)\s+(\d+)', re.IGNORECASE)
+# The event and the number of trials are found separately, so either may come first:
+# "exactly 3 heads in 10 tosses", "A die is rolled 5 times ... at least 2 sixes"
+BINOMIAL_EVENT = re.compile(r'\b(exactly|at least|at most)\s+(\d+)\s+(\w+)', re.IGNORECASE)
+BINOMIAL_TRIALS = re.compile(
+    r'\b(\d+)\s+(?:\w+\s+)?(tosses|toss|throws|throw|rolls|roll|trials|trial|flips|flip|attempts|shots|times)\b',
+    re.IGNORECASE)
+PROBABILITY_VALUE = re.compile(r'\bp\s*=\s*(\d+(?:\.\d+)?(?:/\d+)?)|probability\s+of\s+success\s+(?:is\s+)?'
+                               r'(\d+(?:\.\d+)?(?:/\d+)?)', re.IGNORECASE)
+# Events whose success probability follows from the object alone: (object pattern, p)
+DIE = re.compile(r'\b(?:die|dice)\b', re.IGNORECASE)
+COIN = re.compile(r'\bcoins?\b', re.IGNORECASE)
+FACE_EVENTS = {
+    'six': (DIE, Fraction(1, 6)), 'sixes': (DIE, Fraction(1, 6)),
+    'head': (COIN, Fraction(1, 2)), 'heads': (COIN, Fraction(1, 2)),
+    'tail': (COIN, Fraction(1, 2)), 'tails': (COIN, Fraction(1, 2))
+}
+# Words or notation that make a question a counting/probability one
+CUE_PATTERN = re.compile(
+    r'probab|chance|permut|combination|arrange|choose|select|factorial|\bways\b|\b(?:die|dice|coins?)\b|'
+    r'\b(?:toss|throw|roll|flip|trial)|\b\d+\s?[PC]\s?\d+\b|\b[PC]\(\s*\d+\s*,|\b\d+\s*!(?!=)', re.IGNORECASE)
+
+
+def has_cue(text: str) -> bool:
+    """True if the text reads as a permutation, combination, factorial or probability question"""
+    return bool(CUE_PATTERN.search(text))
+
+
+def _parse_probability(text: str, event: str) -> Optional[Fraction]:
+    """
+    Success probability: stated explicitly (p = 0.3), or implied by a face event of a die or
+    coin (sixes, heads); None when it can't be known or is not in [0, 1]
+    """
+    match = PROBABILITY_VALUE.search(text)
+    if match:
+        try:
+            p = Fraction(match.group(1) or match.group(2)).limit_denominator(10 ** 6)
+        except ZeroDivisionError:
+            return None
+        return p if 0 <= p <= 1 else None
+    face = FACE_EVENTS.get(event.lower())
+    if face and face[0].search(text):
+        return face[1]
+    return None
+
+
+def _first_pair(match):
+    return [int(g) for g in match.groups() if g is not None]
+
+
+def _check_range(kind: str, expression: str, n: int, r: int = None):
+    """Raise OutOfRange for r > n or arguments above MAX_ARGUMENT"""
+    if n > MAX_ARGUMENT:
+        raise OutOfRange(kind, expression, f"argument too large: {n} is above the supported maximum of {MAX_ARGUMENT}")
+    if r is not None and r > n:
+        raise OutOfRange(kind, expression, f"r must be ≤ n, but r = {r} and n = {n}")
+
+
+def _binomial_parts(text: str) -> Optional[tuple]:
+    """(mode, k, event, n) from the event ('at least 2 sixes') and the trials ('5 rolls'), in either order"""
+    event = BINOMIAL_EVENT.search(text)
+    if not event:
+        return None
+    # Blank out the event so 'exactly 3 times in 10 trials' doesn't read 3 as the trial count
+    rest = text[:event.start()] + ' ' * (event.end() - event.start()) + text[event.end():]
+    trials = BINOMIAL_TRIALS.search(rest)
+    if not trials:
+        return None
+    return event.group(1).lower(), int(event.group(2)), event.group(3), int(trials.group(1))
+
+
+def evaluate(text: str) -> Optional[Answer]:
+    """
+    Answer a combinatorics/probability question exactly, or None if it isn't recognized
+    Raises OutOfRange for a recognized question with impossible or oversized numbers
+    """
+    if not has_cue(text):
+        return None
+
+    parts = _binomial_parts(text)
+    if parts:
+        mode, k, event, n = parts
+        p = _parse_probability(text, event)
+        if p is not None:
+            symbol = '=' if mode == 'exactly' else '≥' if mode == 'at least' else '≤'
+            if n > MAX_TRIALS:
+                raise OutOfRange('binomial', f"P(X {symbol} {k})",
+                                 f"too many trials: {n} is above the supported maximum of {MAX_TRIALS}")
+            if k > n:
+                raise OutOfRange('binomial', f"P(X {symbol} {k})",
+                                 f"k must be ≤ n: {k} successes cannot happen in {n} trials")
+            value = binomial_probability(n, k, p, mode)
+            steps = [
+                f"X ~ Binomial(n = {n}, p = {p})",
+                f"P(X = i) = C({n}, i) · ({p})^i · ({1 - p})^({n} - i)",
+                {"exactly": f"P(X = {k})", "at least": f"P(X ≥ {k}) = Σ P(X = i) for i = {k}..{n}",
+                 "at most": f"P(X ≤ {k}) = Σ P(X = i) for i = 0..{k}"}[mode] + f" = {format_value(value)}"
+            ]
+            return Answer('binomial', f"P(X {symbol} {k})", value, steps)
+
+    match = NPR_PATTERN.search(text)
+    if match:
+        n, r = _first_pair(match)
+        _check_range('permutation', f"{n}P{r}", n, r)
+        value = permutations(n, r)
+        return Answer('permutation', f"{n}P{r}", value,
+                      [f"{n}P{r} = {n}! / ({n} - {r})!", f"= {n}! / {n - r}!", _equals(value)])
+
+    match = NCR_PATTERN.search(text)
+    if match:
+        n, r = _first_pair(match)
+        _check_range('combination', f"{n}C{r}", n, r)
+        value = combinations(n, r)
+        return Answer('combination', f"{n}C{r}", value,
+                      [f"{n}C{r} = {n}! / ({r}! · ({n} - {r})!)", f"= {n}! / ({r}! · {n - r}!)", _equals(value)])
+
+    match = SELECT_PATTERN.search(text)
+    if match:
+        verb = match.group(1).lower()
+        r, n = int(match.group(2)), int(match.group(3))
+        kind = 'permutation' if verb in ('arrange', 'permute') else 'combination'
+        _check_range(kind, f"{n}{kind[0].upper()}{r}", n, r)
+        if kind == 'permutation':
+            value = permutations(n, r)
+            return Answer('permutation', f"{n}P{r}", value,
+                          [f"Order matters: {n}P{r} = {n}! / {n - r}!", _equals(value)])
+        value = combinations(n, r)
+        return Answer('combination', f"{n}C{r}", value,
+                      [f"Order does not matter: {n}C{r} = {n}! / ({r}! · {n - r}!)", _equals(value)])
+
+    match = FACTORIAL_PATTERN.search(text)
+    if match:
+        n = _first_pair(match)[0]
+        _check_range('factorial', f"{n}!", n)
+        value = factorial(n)
+        steps = [f"{n}! = {n} × {n - 1} × ... × 1" if n > 1 else f"{n}! = 1", _equals(value)]
+        return Answer('factorial', f"{n}!", value, steps)
+
+    return None
+
+
+def evaluate_batch(texts: Iterable[str]) -> List[Optional[Answer]]:
+    """Evaluate many questions, growing the factorial table once up front"""
+    texts = list(texts)
+    # Numbers beyond the table (or too long to convert) don't affect how far it grows
+    largest = max((int(n) for text in texts for n in re.findall(r'\d+', text) if len(n) <= 6), default=0)
+    _grow_table(largest)
+    return [evaluate(text) for text in texts]
+
+
+def _too_long(n: int) -> bool:
+    """More than MAX_DIGITS decimal digits (decided from the bit length, without printing)"""
+    return abs(n).bit_length() * math.log10(2) > MAX_DIGITS
+
+
+def _magnitude(log10_value: float, sign: int = 1) -> str:
+    exponent = math.floor(log10_value)
+    return f"≈ {'-' if sign < 0 else ''}{10 ** (log10_value - exponent):.6f} × 10^{exponent}"
+
+
+def format_value(value) -> str:
+    """Exact value up to MAX_DIGITS digits, plus a decimal for fractions; beyond that a magnitude"""
+    if isinstance(value, Fraction):
+        if value.denominator == 1:
+            return format_value(value.numerator)
+        if value.numerator == 0:
+            return '0'
+        approximate = math.log10(abs(value.numerator)) - math.log10(value.denominator)
+        if _too_long(value.numerator) or _too_long(value.denominator):
+            return _magnitude(approximate, value.numerator)
+        if -300 < approximate < 300:
+            return f"{value} ≈ {float(value):.6g}"
+        return f"{value} {_magnitude(approximate, value.numerator)}"
+    if _too_long(value):
+        # Too long to be useful (or even printable) in full: give the magnitude
+        exponent = math.log10(abs(value))
+        return f"{_magnitude(exponent, value)} ({math.floor(exponent) + 1} digits)"
+    return str(value)
+
+
+def _equals(value) -> str:
+    """Last step of a working: '= value', or the magnitude on its own"""
+    shown = format_value(value)
+    return shown if shown.startswith('≈') else f"= {shown}"
@@ -0,0 +1,56 @@
+# Gunicorn configuration for pre-fork deployments
+# Usage: gunicorn -c gunicorn.conf.py app:app
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+
+# Import the app once in the master, then fork workers
+preload_app = True
+
+
+def on_starting(server):
+    """
+    Freeze the imported app before any worker is forked
+    JEE_PRELOAD=true also loads the JEEWebSolver model here. It is off by default because
+    app.py's JEESolver never uses the model, so every worker would only carry its weights.
+    """
+    gc.disable()
+    if os.environ.get('JEE_PRELOAD', 'false').lower() == 'true':
+        from jee_ai_model import preload
+        preload()
+        server.log.info("JEE AI model preloaded and frozen in master (pid %s)", os.getpid())
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """The master runs with the collector off; workers turn it back on"""
+    gc.enable()
+
+
+def on_reload(server):
+    """
+    kill -HUP <master pid>: reload the knowledge base here, before the replacement workers fork
+    /admin/reload and SIGHUP to one worker only reach that process; the master's HUP reaches all
+    """
+    from app import reloader
+    result = reloader.reload()
+    if result['success']:
+        server.log.info("Knowledge base reloaded in master: %s", result['fingerprint'])
+    else:
+        server.log.error("Knowledge base reload rejected, workers keep %s: %s",
+                         result['fingerprint'], result['error'])
+
+
+def post_worker_init(worker):
+    """Start this worker's own solver pool (process mode) and log its unique memory"""
+    from app import get_solver_pool
+    get_solver_pool()
+
+    from memory_report import process_memory
+    memory = process_memory()
+    worker.log.info("Worker %s memory: USS %.1f MB, RSS %.1f MB",
+                    worker.pid, memory['uss'] / 2**20, memory['rss'] / 2**20)
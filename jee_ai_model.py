@@ -7,8 +7,69 @@ from transformers import AutoTokenizer, AutoModel, pipeline
 import numpy as np
 import re
 import json
-from typing import Dict, List, Tuple
+from typing import Dict, List, Mapping, Tuple
 import math
+import gc
+import time
+import threading
+from collections import OrderedDict
+from prepared_question import prepare
+from knowledge_base import KnowledgeBase, get_knowledge_base
+from profiler import get_request_profiler
+
+
+# Shown when a chemistry question names no known element
+COMMON_ELEMENTS = ('H', 'C', 'N', 'O', 'Na', 'Cl')
+
+# Subject prompt prefixes end here; the student's question follows
+PREFIX_TAIL = "\nQuestion: "
+# Context positions kept free behind a subject prefix for the question and the answer
+RESERVED_CONTEXT_TOKENS = 256
+
+
+class PrefixKVCache:
+    """
+    Bounded LRU cache of transformer past_key_values for fixed prompt prefixes
+    Each subject prefix is run through the model once; later requests resume from it
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
 
 class JEEProblemSolver:
     """
@@ -23,97 +84,178 @@ class JEEProblemSolver:
         self.tokenizer = AutoTokenizer.from_pretrained('microsoft/DialoGPT-medium')
         self.math_pipeline = pipeline('text-generation', model='microsoft/DialoGPT-medium')
         
-        # Initialize subject-specific knowledge bases
-        self.physics_formulas = self._load_physics_formulas()
-        self.chemistry_reactions = self._load_chemistry_reactions()
-        self.math_rules = self._load_math_rules()
+        # Subject-specific knowledge bases are loaded once per process and shared;
+        # the properties below always return the current (possibly hot-reloaded) content
+        get_knowledge_base()
+        
+        # Subject prompt prefixes are long and fixed, so their KV state is cached
+        self.generation_model = self.math_pipeline.model
+        self.generation_model.eval()
+        self.prefix_cache = PrefixKVCache(max_entries=8)
         
         print("✅ JEE AI Solver Ready!")
     
-    def _load_physics_formulas(self) -> Dict:
-        """Load physics formulas and constants"""
-        return {
-            'kinematics': {
-                'v = u + at': 'Final velocity formula',
-                's = ut + 0.5*a*t²': 'Displacement formula',
-                'v² = u² + 2as': 'Velocity-displacement relation'
-            },
-            'dynamics': {
-                'F = ma': 'Newton\'s second law',
-                'F = μN': 'Friction force',
-                'W = F.s': 'Work formula'
-            },
-            'energy': {
-                'KE = 0.5*m*v²': 'Kinetic energy',
-                'PE = mgh': 'Gravitational potential energy',
-                'E = KE + PE': 'Conservation of energy'
-            },
-            'constants': {
-                'g': 9.8,  # m/s²
-                'c': 3e8,  # m/s
-                'h': 6.626e-34,  # J.s
-                'e': 1.6e-19  # C
-            }
-        }
+    @property
+    def knowledge_base(self) -> KnowledgeBase:
+        return get_knowledge_base()
     
-    def _load_chemistry_reactions(self) -> Dict:
-        """Load chemistry reactions and molecular data"""
-        return {
-            'acids_bases': {
-                'HCl + NaOH → NaCl + H₂O': 'Neutralization',
-                'H₂SO₄ + 2NaOH → Na₂SO₄ + 2H₂O': 'Diprotic acid neutralization'
-            },
-            'organic': {
-                'CH₄ + 2O₂ → CO₂ + 2H₂O': 'Methane combustion',
-                'C₂H₄ + H₂ → C₂H₆': 'Hydrogenation of ethene'
-            },
-            'molecular_weights': {
-                'H': 1, 'C': 12, 'N': 14, 'O': 16, 'Na': 23, 'Cl': 35.5,
-                'Ca': 40, 'Fe': 56, 'Cu': 63.5, 'Zn': 65.4, 'Ag': 108
-            }
-        }
+    @property
+    def physics_formulas(self) -> Mapping:
+        return self._load_physics_formulas()
+    
+    @property
+    def chemistry_reactions(self) -> Mapping:
+        return self._load_chemistry_reactions()
+    
+    @property
+    def math_rules(self) -> Mapping:
+        return self._load_math_rules()
+    
+    def _load_physics_formulas(self) -> Mapping:
+        """Physics formulas and constants (read-only view of the shared knowledge base)"""
+        return get_knowledge_base().physics_formulas
+    
+    def _load_chemistry_reactions(self) -> Mapping:
+        """Chemistry reactions and molecular data (read-only view of the shared knowledge base)"""
+        return get_knowledge_base().chemistry_reactions
+    
+    def _load_math_rules(self) -> Mapping:
+        """Mathematical rules and formulas (read-only view of the shared knowledge base)"""
+        return get_knowledge_base().math_rules
+    
+    def build_subject_prefix(self, subject: str, kb: KnowledgeBase = None) -> str:
+        """Build the fixed instruction + formula prefix for a subject's prompts"""
+        kb = kb or get_knowledge_base()
+        if subject == 'physics':
+            sections = {k: v for k, v in kb.physics_formulas.items() if k != 'constants'}
+        elif subject == 'chemistry':
+            sections = {k: v for k, v in kb.chemistry_reactions.items() if k != 'molecular_weights'}
+        else:
+            sections = kb.math_rules
+        
+        prefix = f"You are a JEE {subject} tutor. Solve the student's question step by step, "
+        prefix += "state the formulas used, and check units in the final answer.\n\n"
+        prefix += "Reference:\n"
+        for section, entries in sections.items():
+            prefix += f"[{section}]\n"
+            for key, value in entries.items():
+                prefix += f"- {key}: {value}\n"
+        prefix += PREFIX_TAIL
+        return prefix
     
-    def _load_math_rules(self) -> Dict:
-        """Load mathematical rules and formulas"""
+    def _context_size(self) -> int:
+        """Positions the generation model can attend over (1024 for DialoGPT)"""
+        config = self.generation_model.config
+        return getattr(config, 'n_positions', None) or config.max_position_embeddings
+    
+    def _prefix_ids(self, subject: str, kb: KnowledgeBase = None):
+        """
+        Token ids of a subject prefix, cut to leave RESERVED_CONTEXT_TOKENS of the context free
+        A long reference section is truncated; the tail introducing the question is kept
+        """
+        ids = self.tokenizer(self.build_subject_prefix(subject, kb), return_tensors='pt').input_ids
+        budget = self._context_size() - RESERVED_CONTEXT_TOKENS
+        if ids.shape[-1] > budget:
+            tail = self.tokenizer(PREFIX_TAIL, return_tensors='pt').input_ids
+            ids = torch.cat([ids[:, :budget - tail.shape[-1]], tail], dim=-1)
+        return ids
+    
+    def _get_prefix_state(self, subject: str, kb: KnowledgeBase = None):
+        """Return (prefix_ids, past_key_values) for a subject, computing it once"""
+        kb = kb or get_knowledge_base()
+        # Keyed on the content fingerprint: a knowledge base reload makes old prefixes unreachable
+        key = (subject, kb.fingerprint)
+        entry = self.prefix_cache.get(key)
+        if entry is not None:
+            return entry
+        
+        prefix_ids = self._prefix_ids(subject, kb)
+        with torch.no_grad():
+            outputs = self.generation_model(input_ids=prefix_ids, use_cache=True)
+        entry = (prefix_ids, outputs.past_key_values)
+        self.prefix_cache.put(key, entry)
+        return entry
+    
+    def generate_answer(self, question: str, subject: str, max_new_tokens: int = 128,
+                        use_prefix_cache: bool = True) -> Dict:
+        """
+        Greedy generation for a question behind its subject prefix
+        With the cache only the question tokens are run through the model before decoding
+        Prefix, question and answer together never exceed the model's context: the
+        question is truncated and max_new_tokens lowered to fit
+        Returns: text, time_to_first_token and total_time (seconds)
+        """
+        start = time.perf_counter()
+        kb = get_knowledge_base()
+        question_ids = self.tokenizer(question, return_tensors='pt').input_ids
+        
+        with torch.no_grad():
+            if use_prefix_cache:
+                prefix_ids, past = self._get_prefix_state(subject, kb)
+            else:
+                prefix_ids = self._prefix_ids(subject, kb)
+            
+            room = self._context_size() - prefix_ids.shape[-1]
+            max_new_tokens = max(1, min(max_new_tokens, room - 1))
+            question_ids = question_ids[:, :room - max_new_tokens]
+            
+            if use_prefix_cache:
+                # Cached tensors are never modified in place: the model concatenates new ones
+                outputs = self.generation_model(input_ids=question_ids, past_key_values=past,
+                                                use_cache=True)
+            else:
+                outputs = self.generation_model(input_ids=torch.cat([prefix_ids, question_ids], dim=-1),
+                                                use_cache=True)
+            
+            next_token = outputs.logits[:, -1, :].argmax(dim=-1, keepdim=True)
+            time_to_first_token = time.perf_counter() - start
+            past = outputs.past_key_values
+            generated = [next_token.item()]
+            
+            for _ in range(max_new_tokens - 1):
+                if generated[-1] == self.tokenizer.eos_token_id:
+                    break
+                outputs = self.generation_model(input_ids=next_token, past_key_values=past,
+                                                use_cache=True)
+                past = outputs.past_key_values
+                next_token = outputs.logits[:, -1, :].argmax(dim=-1, keepdim=True)
+                generated.append(next_token.item())
+        
         return {
-            'calculus': {
-                'power_rule': 'd/dx(xⁿ) = n·xⁿ⁻¹',
-                'product_rule': 'd/dx(uv) = u\'v + uv\'',
-                'chain_rule': 'd/dx(f(g(x))) = f\'(g(x))·g\'(x)'
-            },
-            'algebra': {
-                'quadratic_formula': 'x = (-b ± √(b²-4ac)) / 2a',
-                'difference_of_squares': 'a² - b² = (a+b)(a-b)'
-            },
-            'trigonometry': {
-                'sin²x + cos²x = 1': 'Pythagorean identity',
-                'sin(A+B) = sinA·cosB + cosA·sinB': 'Addition formula'
-            }
+            'text': self.tokenizer.decode(generated, skip_special_tokens=True),
+            'time_to_first_token': time_to_first_token,
+            'total_time': time.perf_counter() - start
         }
     
-    def identify_problem_type(self, question: str) -> Tuple[str, str]:
+    def measure_time_to_first_token(self, question: str, subject: str, runs: int = 5) -> Dict:
+        """Compare mean time-to-first-token with and without the prefix KV cache"""
+        self._get_prefix_state(subject)  # warm the cache so we time steady state
+        
+        results = {}
+        for label, use_cache in (('without_cache', False), ('with_cache', True)):
+            timings = [
+                self.generate_answer(question, subject, max_new_tokens=1,
+                                     use_prefix_cache=use_cache)['time_to_first_token']
+                for _ in range(runs)
+            ]
+            results[label] = sum(timings) / len(timings)
+        
+        results['speedup'] = results['without_cache'] / results['with_cache']
+        results['cache'] = self.prefix_cache.stats()
+        return results
+    
+    def identify_problem_type(self, question) -> Tuple[str, str]:
         """
         Identify the subject and specific topic of the problem
         Returns: (subject, topic)
         """
-        question_lower = question.lower()
-        
-        # Physics keywords
-        physics_keywords = ['velocity', 'acceleration', 'force', 'energy', 'momentum', 
-                           'electric', 'magnetic', 'wave', 'optics', 'thermodynamics']
-        
-        # Chemistry keywords  
-        chemistry_keywords = ['molecule', 'reaction', 'acid', 'base', 'molarity',
-                             'organic', 'bond', 'electron', 'atom', 'compound']
+        question = prepare(question)
+        question_lower = question.text
         
-        # Math keywords
-        math_keywords = ['derivative', 'integral', 'limit', 'matrix', 'probability',
-                        'equation', 'function', 'graph', 'solve', 'calculate']
-        
-        # Count keyword matches
-        physics_score = sum(1 for kw in physics_keywords if kw in question_lower)
-        chemistry_score = sum(1 for kw in chemistry_keywords if kw in question_lower)
-        math_score = sum(1 for kw in math_keywords if kw in question_lower)
+        # Keyword match counts (see prepared_question.SUBJECT_KEYWORDS)
+        physics_score = question.features['physics']
+        chemistry_score = question.features['chemistry']
+        math_score = question.features['mathematics']
         
         # Determine subject
         if physics_score >= chemistry_score and physics_score >= math_score:
@@ -137,23 +279,14 @@ class JEEProblemSolver:
             
         return subject, topic
     
-    def extract_numbers(self, text: str) -> List[float]:
+    def extract_numbers(self, text) -> List[float]:
         """Extract numerical values from the problem"""
-        # Pattern to match numbers (including decimals and scientific notation)
-        pattern = r'-?\d+\.?\d*(?:[eE][+-]?\d+)?'
-        numbers = []
-        
-        for match in re.finditer(pattern, text):
-            try:
-                numbers.append(float(match.group()))
-            except ValueError:
-                continue
-                
-        return numbers
+        return list(prepare(text).quantities)
     
-    def solve_physics_problem(self, question: str, topic: str) -> str:
+    def solve_physics_problem(self, question, topic: str, kb: KnowledgeBase = None) -> str:
         """Solve physics problems using formula-based approach"""
-        numbers = self.extract_numbers(question)
+        kb = kb or get_knowledge_base()
+        numbers = prepare(question).quantities
         
         if topic == 'kinematics':
             solution = "🔬 PHYSICS SOLUTION - KINEMATICS\n\n"
@@ -169,7 +302,7 @@ class JEEProblemSolver:
             solution += "4. Substitute values and solve\n\n"
             
             solution += "🧮 Key Formulas:\n"
-            for formula, desc in self.physics_formulas['kinematics'].items():
+            for formula, desc in kb.physics_formulas['kinematics'].items():
                 solution += f"• {formula} ({desc})\n"
                 
             solution += "\n📊 Solution Steps:\n"
@@ -185,7 +318,7 @@ class JEEProblemSolver:
             solution += "• Apply Newton's laws of motion\n\n"
             
             solution += "🧮 Key Formulas:\n" 
-            for formula, desc in self.physics_formulas['dynamics'].items():
+            for formula, desc in kb.physics_formulas['dynamics'].items():
                 solution += f"• {formula} ({desc})\n"
                 
         else:
@@ -199,13 +332,15 @@ class JEEProblemSolver:
             
         return solution
     
-    def solve_chemistry_problem(self, question: str) -> str:
+    def solve_chemistry_problem(self, question, kb: KnowledgeBase = None) -> str:
         """Solve chemistry problems"""
+        kb = kb or get_knowledge_base()
         solution = "🧪 CHEMISTRY SOLUTION\n\n"
         
-        numbers = self.extract_numbers(question)
+        question = prepare(question)
+        numbers = question.quantities
         
-        if 'molarity' in question.lower() or 'concentration' in question.lower():
+        if question.mentions('molarity', 'concentration'):
             solution += "📋 Molarity Calculation:\n"
             solution += "Formula: M = n/V (where n = moles, V = volume in L)\n\n"
             
@@ -214,7 +349,7 @@ class JEEProblemSolver:
                 volume = numbers[1] / 1000 if numbers[1] > 10 else numbers[1]  # Convert mL to L
                 solution += f"• Given: {mass}g solute, {volume*1000}mL solution\n"
                 
-        elif 'balance' in question.lower() or 'equation' in question.lower():
+        elif question.mentions('balance', 'equation'):
             solution += "📋 Chemical Equation Balancing:\n"
             solution += "1. Count atoms of each element on both sides\n"
             solution += "2. Add coefficients to balance\n"
@@ -227,14 +362,26 @@ class JEEProblemSolver:
         solution += "• Conservation of mass\n"
         solution += "• Reaction mechanisms\n\n"
         
+        # Weights for the elements in the question's formulas (e.g. NaOH), else the common ones
+        weights = kb.molecular_weights
+        elements = kb.elements_in_text(question.raw) or COMMON_ELEMENTS
         solution += "📊 Molecular Weights (g/mol):\n"
-        for element, weight in list(self.chemistry_reactions['molecular_weights'].items())[:6]:
-            solution += f"• {element}: {weight}\n"
+        for element in elements:
+            if element in weights:
+                solution += f"• {element}: {weights[element]}\n"
+        
+        reactions = {r for compound in kb.compounds_in_text(question.raw)
+                     for r in kb.reactions_with(compound)}
+        if reactions:
+            solution += "\n⚗️ Related Reactions:\n"
+            for reaction in sorted(reactions, key=lambda r: r.equation):
+                solution += f"• {reaction.equation} ({reaction.description})\n"
             
         return solution
     
-    def solve_math_problem(self, question: str, topic: str) -> str:
+    def solve_math_problem(self, question, topic: str, kb: KnowledgeBase = None) -> str:
         """Solve mathematics problems"""
+        kb = kb or get_knowledge_base()
         solution = "📐 MATHEMATICS SOLUTION\n\n"
         
         if topic == 'calculus':
@@ -242,17 +389,17 @@ class JEEProblemSolver:
             solution += "Differentiation/Integration approach\n\n"
             
             solution += "🧮 Key Rules:\n"
-            for rule, formula in self.math_rules['calculus'].items():
+            for rule, formula in kb.math_rules['calculus'].items():
                 solution += f"• {rule.replace('_', ' ').title()}: {formula}\n"
                 
         elif topic == 'algebra':
             solution += "📋 Algebraic Problem:\n"
             solution += "Equation solving approach\n\n"
             
-            numbers = self.extract_numbers(question)
+            numbers = prepare(question).quantities
             if len(numbers) >= 3:  # Might be quadratic
                 solution += f"• Coefficients detected: a={numbers[0]}, b={numbers[1]}, c={numbers[2]}\n"
-                solution += f"• Quadratic formula: {self.math_rules['algebra']['quadratic_formula']}\n"
+                solution += f"• Quadratic formula: {kb.math_rules['algebra']['quadratic_formula']}\n"
                 
         else:
             solution += "📋 General Mathematical Approach:\n"
@@ -264,23 +411,26 @@ class JEEProblemSolver:
             
         return solution
     
-    def solve_problem(self, question: str) -> str:
+    def solve_problem(self, question) -> str:
         """
         Main function to solve any JEE problem
         """
-        print(f"🤔 Analyzing question: {question[:50]}...")
+        # Preprocess once; every stage below reads from the prepared question
+        question = prepare(question)
+        print(f"🤔 Analyzing question: {question.raw[:50]}...")
         
         # Identify problem type
         subject, topic = self.identify_problem_type(question)
         print(f"📚 Identified: {subject.title()} - {topic.title()}")
         
-        # Route to appropriate solver
+        # Route to appropriate solver, on one knowledge base snapshot for the whole request
+        kb = get_knowledge_base()
         if subject == 'physics':
-            solution = self.solve_physics_problem(question, topic)
+            solution = self.solve_physics_problem(question, topic, kb)
         elif subject == 'chemistry':
-            solution = self.solve_chemistry_problem(question)
+            solution = self.solve_chemistry_problem(question, kb)
         else:  # mathematics
-            solution = self.solve_math_problem(question, topic)
+            solution = self.solve_math_problem(question, topic, kb)
             
         # Add general study tips
         solution += "\n\n🎓 Study Tips:\n"
@@ -294,6 +444,32 @@ class JEEProblemSolver:
         
         return solution
 
+# Process-wide solver shared by every JEEWebSolver (and, after preload, by forked workers)
+_shared_solver = None
+_shared_solver_lock = threading.Lock()
+
+def get_shared_solver() -> JEEProblemSolver:
+    """Return the process-wide JEEProblemSolver, loading it on first use"""
+    global _shared_solver
+    if _shared_solver is None:
+        with _shared_solver_lock:
+            if _shared_solver is None:
+                _shared_solver = JEEProblemSolver()
+    return _shared_solver
+
+def preload() -> JEEProblemSolver:
+    """
+    Load model weights and knowledge bases in the master process before forking
+    The collector is disabled first so loading leaves no freed holes in shared pages, then
+    everything is moved to the permanent generation so collections in the children never
+    touch (and copy) it. Each child must call gc.enable() after the fork.
+    """
+    gc.disable()
+    solver = get_shared_solver()
+    gc.collect()
+    gc.freeze()
+    return solver
+
 # Web Integration Class
 class JEEWebSolver:
     """
@@ -301,23 +477,27 @@ class JEEWebSolver:
     """
     
     def __init__(self):
-        self.solver = JEEProblemSolver()
+        self.solver = get_shared_solver()
+        self.profiler = get_request_profiler()
         
     def get_solution(self, question: str, subject: str = None) -> Dict:
         """
         Get solution for web app
         Returns formatted response for the website
         """
+        session = self.profiler.begin(question, subject)
+        result = None
         try:
             solution = self.solver.solve_problem(question)
             
-            return {
+            result = {
                 'success': True,
                 'solution': solution,
                 'confidence': 0.95,  # You can implement confidence scoring
                 'subject': subject,
                 'processing_time': 1.2  # You can measure actual time
             }
+            return result
             
         except Exception as e:
             return {
@@ -325,6 +505,9 @@ class JEEWebSolver:
                 'error': f"Sorry, there was an error: {str(e)}",
                 'solution': "Please try rephrasing your question or check for typos."
             }
+        finally:
+            if session is not None:
+                self.profiler.end(session, result)
 
 # Example Usage and Testing
 if __name__ == "__main__":
@@ -353,6 +536,11 @@ if __name__ == "__main__":
             
         print("-" * 50)
     
+    # Time-to-first-token with and without the subject prefix KV cache
+    ttft = web_solver.solver.measure_time_to_first_token(test_questions[0], 'physics')
+    print(f"⏱️ TTFT without prefix cache: {ttft['without_cache']*1000:.1f} ms")
+    print(f"⏱️ TTFT with prefix cache: {ttft['with_cache']*1000:.1f} ms ({ttft['speedup']:.1f}x)")
+    
     print("\n🎉 JEE AI Solver is ready for deployment!")
     print("💡 To use with your web app:")
     print("1. Run this Python script on a server")  
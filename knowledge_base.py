@@ -0,0 +1,304 @@
+# Immutable, process-wide JEE knowledge base with inverted indexes
+# Loaded once from data/knowledge_base.json (or $JEE_KB_PATH) and shared by every solver.
+# A reload builds a complete new KnowledgeBase off to the side and swaps one reference,
+# so requests holding the old one finish with consistent content.
+
+import hashlib
+import json
+import os
+import re
+import string
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, Mapping, Optional, Tuple
+
+DEFAULT_KB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'knowledge_base.json')
+
+Formula = namedtuple('Formula', ['subject', 'topic', 'expression', 'description', 'variables'])
+Reaction = namedtuple('Reaction', ['topic', 'equation', 'description', 'species', 'elements'])
+
+SUBSCRIPTS = str.maketrans('₀₁₂₃₄₅₆₇₈₉', '0123456789')
+ELEMENT_PATTERN = re.compile(r'[A-Z][a-z]?')
+# A chemical formula token: element symbols with optional counts, e.g. NaOH, H2SO4, C₂H₆,
+# after any stoichiometric coefficient (2H2O -> H2O)
+FORMULA_TOKEN = re.compile(r'(?<![A-Za-z0-9])\d*((?:[A-Z][a-z]?\d*)+)\b')
+ELEMENT_SYMBOLS = frozenset((
+    'H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se Br '
+    'Kr Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho '
+    'Er Tm Yb Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es '
+    'Fm Md No Lr Rf Db Sg Bh Hs Mt Ds Rg Cn Nh Fl Mc Lv Ts Og'
+).split())
+# Lone symbols that are far more often a capitalised English word ("In a flask", "He found")
+ENGLISH_SYMBOLS = frozenset({'I', 'In', 'As', 'At', 'Be', 'He', 'No', 'Am', 'Ho'})
+
+
+def parse_species(equation: str) -> Tuple[str, ...]:
+    """Compounds in a reaction, without stoichiometric coefficients"""
+    species = []
+    for side in re.split(r'→|->|=', equation.translate(SUBSCRIPTS)):
+        for term in side.split('+'):
+            compound = term.strip().lstrip('0123456789').strip()
+            if compound and compound not in species:
+                species.append(compound)
+    return tuple(species)
+
+
+def parse_elements(compound: str) -> Tuple[str, ...]:
+    """Element symbols in a compound, in order of first appearance"""
+    return tuple(dict.fromkeys(ELEMENT_PATTERN.findall(compound.translate(SUBSCRIPTS))))
+
+
+def formula_tokens(text: str) -> Tuple[str, ...]:
+    """Tokens in text that are made only of real element symbols ('If' and 'Of' are not)"""
+    tokens = []
+    for token in FORMULA_TOKEN.findall(text.translate(SUBSCRIPTS)):
+        if token in ENGLISH_SYMBOLS:
+            continue
+        if all(symbol in ELEMENT_SYMBOLS for symbol in ELEMENT_PATTERN.findall(token)):
+            tokens.append(token)
+    return tuple(tokens)
+
+
+def _freeze_index(index: Dict[str, list]) -> Mapping[str, tuple]:
+    return MappingProxyType({key: tuple(values) for key, values in index.items()})
+
+
+class KnowledgeBase:
+    """
+    Read-only formulas, reactions and rules with constant-time lookups
+    by topic, by variable symbol and by element or compound
+    """
+
+    __slots__ = ('version', 'fingerprint', 'formulas', 'reactions', 'constants', 'molecular_weights',
+                 'physics_formulas', 'chemistry_reactions', 'math_rules', 'templates',
+                 '_by_topic', '_by_symbol', '_by_chemical')
+
+    def __init__(self, data: Mapping):
+        set_slot = object.__setattr__
+        formulas, reactions = [], []
+        by_topic, by_symbol, by_chemical = {}, {}, {}
+
+        for topic, entries in data.get('physics_formulas', {}).items():
+            for entry in entries:
+                formula = Formula('physics', topic, entry['formula'], entry['description'],
+                                  tuple(entry.get('variables', ())))
+                formulas.append(formula)
+                by_topic.setdefault(topic, []).append(formula)
+                for symbol in formula.variables:
+                    by_symbol.setdefault(symbol, []).append(formula)
+
+        for topic, entries in data.get('math_rules', {}).items():
+            for entry in entries:
+                formula = Formula('mathematics', topic, entry['name'], entry['rule'],
+                                  tuple(entry.get('variables', ())))
+                formulas.append(formula)
+                by_topic.setdefault(topic, []).append(formula)
+                for symbol in formula.variables:
+                    by_symbol.setdefault(symbol, []).append(formula)
+
+        for topic, entries in data.get('chemistry_reactions', {}).items():
+            for entry in entries:
+                species = tuple(entry.get('species') or parse_species(entry['equation']))
+                elements = tuple(entry.get('elements') or
+                                 dict.fromkeys(e for s in species for e in parse_elements(s)))
+                reaction = Reaction(topic, entry['equation'], entry['description'], species, elements)
+                reactions.append(reaction)
+                by_topic.setdefault(topic, []).append(reaction)
+                for key in dict.fromkeys(species + elements):
+                    by_chemical.setdefault(key, []).append(reaction)
+
+        constants = MappingProxyType(dict(data.get('physical_constants', {})))
+        molecular_weights = MappingProxyType(dict(data.get('molecular_weights', {})))
+
+        # Caches derived from this content key on the fingerprint, so any edit invalidates them
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        set_slot(self, 'version', data.get('version', 0))
+        set_slot(self, 'fingerprint', f"v{data.get('version', 0)}-{digest[:12]}")
+        set_slot(self, 'templates', MappingProxyType({
+            name: '\n'.join(lines) if isinstance(lines, list) else lines
+            for name, lines in data.get('solution_templates', {}).items()
+        }))
+        set_slot(self, 'formulas', tuple(formulas))
+        set_slot(self, 'reactions', tuple(reactions))
+        set_slot(self, 'constants', constants)
+        set_slot(self, 'molecular_weights', molecular_weights)
+        set_slot(self, '_by_topic', _freeze_index(by_topic))
+        set_slot(self, '_by_symbol', _freeze_index(by_symbol))
+        set_slot(self, '_by_chemical', _freeze_index(by_chemical))
+
+        # Nested {topic: {key: value}} views in the shape JEEProblemSolver has always used
+        def view(topic, kind, subject=None):
+            return MappingProxyType({
+                entry[2]: entry[3] for entry in by_topic.get(topic, ())
+                if isinstance(entry, kind) and (subject is None or entry.subject == subject)
+            })
+
+        physics = {topic: view(topic, Formula, 'physics') for topic in data.get('physics_formulas', {})}
+        physics['constants'] = constants
+        chemistry = {topic: view(topic, Reaction) for topic in data.get('chemistry_reactions', {})}
+        chemistry['molecular_weights'] = molecular_weights
+        math = {topic: view(topic, Formula, 'mathematics') for topic in data.get('math_rules', {})}
+        set_slot(self, 'physics_formulas', MappingProxyType(physics))
+        set_slot(self, 'chemistry_reactions', MappingProxyType(chemistry))
+        set_slot(self, 'math_rules', MappingProxyType(math))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("KnowledgeBase is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("KnowledgeBase is immutable")
+
+    def by_topic(self, topic: str) -> tuple:
+        """Formulas, rules or reactions filed under a topic"""
+        return self._by_topic.get(topic, ())
+
+    def formulas_with(self, *symbols: str) -> Tuple[Formula, ...]:
+        """Formulas involving all of the given variable symbols, e.g. formulas_with('v', 'a', 't')"""
+        if not symbols:
+            return ()
+        matches = self._by_symbol.get(symbols[0], ())
+        for symbol in symbols[1:]:
+            others = set(self._by_symbol.get(symbol, ()))
+            matches = tuple(f for f in matches if f in others)
+        return matches
+
+    def reactions_with(self, chemical: str) -> Tuple[Reaction, ...]:
+        """Reactions involving an element (e.g. 'Na') or compound (e.g. 'NaOH' or 'H₂O')"""
+        return self._by_chemical.get(chemical.translate(SUBSCRIPTS), ())
+
+    def compounds_in_text(self, text: str) -> Tuple[str, ...]:
+        """Chemical formulas written in a question that the knowledge base knows reactions for"""
+        return tuple(dict.fromkeys(
+            token for token in formula_tokens(text) if token in self._by_chemical
+        ))
+
+    def elements_in_text(self, text: str) -> Tuple[str, ...]:
+        """Known elements in the chemical formulas written in a question, e.g. 'NaOH' -> Na, O, H"""
+        found = {}
+        for token in formula_tokens(text):
+            for element in parse_elements(token):
+                if element in self.molecular_weights:
+                    found[element] = None
+        return tuple(found)
+
+    def stats(self) -> Dict:
+        return {
+            'version': self.version,
+            'fingerprint': self.fingerprint,
+            'templates': len(self.templates),
+            'formulas': len(self.formulas),
+            'reactions': len(self.reactions),
+            'topics': len(self._by_topic),
+            'symbols': len(self._by_symbol),
+            'chemicals': len(self._by_chemical)
+        }
+
+
+def template_fields(template: str) -> FrozenSet[str]:
+    """Placeholder names in a str.format template; raises ValueError if the template is malformed"""
+    return frozenset(field for _, field, _, _ in string.Formatter().parse(template) if field is not None)
+
+
+def validate_templates(knowledge_base: KnowledgeBase, required: Mapping[str, FrozenSet[str]]):
+    """Raise ValueError unless every required template exists with exactly the expected placeholders"""
+    problems = []
+    for name, expected in required.items():
+        template = knowledge_base.templates.get(name)
+        if not isinstance(template, str):
+            problems.append(f"'{name}' is missing")
+            continue
+        try:
+            fields = template_fields(template)
+        except ValueError as e:
+            problems.append(f"'{name}' is malformed ({e})")
+            continue
+        if fields != set(expected):
+            problems.append(f"'{name}' has placeholders {sorted(fields)}, expected {sorted(expected)}")
+    if problems:
+        raise ValueError("Invalid solution templates: " + '; '.join(problems))
+
+
+def load_knowledge_base(path: str = None) -> KnowledgeBase:
+    """Build a KnowledgeBase from a JSON file"""
+    with open(path or DEFAULT_KB_PATH, encoding='utf-8') as f:
+        return KnowledgeBase(json.load(f))
+
+
+_knowledge_base = None
+_knowledge_base_lock = threading.Lock()
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    """
+    Current process-wide knowledge base, loaded on first use from $JEE_KB_PATH or the bundled file
+    Take one reference per request and use it throughout: a reload may swap it at any time
+    """
+    global _knowledge_base
+    if _knowledge_base is None:
+        with _knowledge_base_lock:
+            if _knowledge_base is None:
+                _knowledge_base = load_knowledge_base(os.environ.get('JEE_KB_PATH'))
+    return _knowledge_base
+
+
+class KnowledgeBaseReloader:
+    """
+    Rebuilds the knowledge base in a background thread and swaps it in atomically
+    A file that fails to load, or lacks a required template, is rejected before the swap.
+    on_change(knowledge_base) runs after a swap that changed the content; a dict it
+    returns is added to the reload result.
+    """
+
+    def __init__(self, path: str = None, required_templates: Mapping[str, FrozenSet[str]] = None,
+                 on_change: Callable[[KnowledgeBase], Optional[Dict]] = None):
+        self.path = path
+        self.required_templates = required_templates or {}
+        self.on_change = on_change
+        self._thread = None
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.last_reload = None
+
+    def reload(self) -> Dict:
+        """Load, index and swap synchronously; a broken file leaves the current content in place"""
+        global _knowledge_base
+        start = time.perf_counter()
+        previous = get_knowledge_base()
+        try:
+            knowledge_base = load_knowledge_base(self.path or os.environ.get('JEE_KB_PATH'))
+            validate_templates(knowledge_base, self.required_templates)
+        except Exception as e:
+            result = {'success': False, 'error': f"{type(e).__name__}: {e}",
+                      'fingerprint': previous.fingerprint}
+        else:
+            with _knowledge_base_lock:
+                _knowledge_base = knowledge_base
+                self.reloads += 1
+            result = {'success': True, 'previous': previous.fingerprint,
+                      'fingerprint': knowledge_base.fingerprint,
+                      'changed': knowledge_base.fingerprint != previous.fingerprint}
+            if result['changed'] and self.on_change is not None:
+                result.update(self.on_change(knowledge_base) or {})
+        result['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        result['finished_at'] = time.time()
+        self.last_reload = result
+        return result
+
+    def reload_async(self) -> bool:
+        """Start a background reload; returns False if one is already running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self.reload, name='kb-reload', daemon=True)
+            self._thread.start()
+            return True
+
+    def status(self) -> Dict:
+        return {
+            'current': get_knowledge_base().stats(),
+            'reloading': self._thread is not None and self._thread.is_alive(),
+            'reloads': self.reloads,
+            'last_reload': self.last_reload
+        }
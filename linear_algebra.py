@@ -0,0 +1,488 @@
+# Matrix, determinant and vector solver for the Linear Algebra topic
+# Parses matrices, vectors and linear systems written in question text. Small matrices are
+# solved exactly with Fractions (JEE answers are fractions); larger ones are batched across
+# questions as stacked NumPy arrays.
+
+import re
+from collections import namedtuple
+from fractions import Fraction
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+# Matrices up to this size are solved exactly
+EXACT_MAX_SIZE = 8
+# Numeric answers for integer input are turned back into exact integers/fractions when
+# det divides out within this size and every entry lands this close to a whole multiple
+MAX_EXACT_DENOMINATOR = 10 ** 6
+ROUNDING_TOLERANCE = 1e-6
+# ...and stays this far below 2**53, where float64 stops resolving fractions of a unit and
+# any value would pass; the 2**20 margin covers the error LU elimination builds up
+EXACT_ROUNDING_LIMIT = 2.0 ** 53 / 2 ** 20
+
+# How each kind reads in "This is {kind} problem"
+KIND_LABELS = {
+    'determinant': 'a determinant',
+    'inverse': 'an inverse matrix',
+    'rank': 'a matrix rank',
+    'solve': 'a linear system',
+    'dot': 'a dot product',
+    'cross': 'a cross product'
+}
+SYSTEM_OUTCOMES = {
+    'infinite': 'no unique solution (infinitely many solutions)',
+    'inconsistent': 'no unique solution (none: the equations are inconsistent)'
+}
+
+Problem = namedtuple('Problem', ['kind', 'operands', 'expression'])
+Answer = namedtuple('Answer', ['kind', 'expression', 'value', 'steps'])
+
+NUMBER = r'-?\d+(?:\.\d+)?(?:/\d+)?'
+NUMBER_PATTERN = re.compile(NUMBER)
+
+# [[1, 2], [3, 4]]
+NESTED_MATRIX = re.compile(r'\[\s*(\[[^\[\]]*\](?:\s*,?\s*\[[^\[\]]*\])+)\s*\]')
+# [1 2; 3 4] or |1 2; 3 4|
+ROW_MATRIX = re.compile(r'([\[|])([^\[\]|;]*(?:;[^\[\]|;]*)+)[\]|]')
+# (1, 2, 3), <1, 2, 3> or [1, 2, 3]
+BRACKET_VECTOR = re.compile(r'[(<\[]\s*(' + NUMBER + r'(?:\s*,\s*' + NUMBER + r')+)\s*[)>\]]')
+# 2i + 3j - k
+UNIT_VECTOR = re.compile(
+    r'(?<![A-Za-z])((?:[+-]?\s*(?:\d+(?:\.\d+)?(?:/\d+)?)?\s*\*?\s*[ijk](?![A-Za-z])\s*)+)')
+UNIT_TERM = re.compile(r'([+-]?)\s*(\d+(?:\.\d+)?(?:/\d+)?)?\s*\*?\s*([ijk])')
+# Equations are read clause by clause: 'x + y = 2, x - y = 0 and 2x + y - 1 = z'
+CLAUSE_SEPARATOR = re.compile(r'[,;?\n]|\band\b|\.(?!\d)', re.IGNORECASE)
+# One side of an equation: numbers, operators and single-letter variables ('2x + 3Y - 1')
+SIDE = r'(?:(?<![A-Za-z])[A-Za-z](?![A-Za-z])|[\d.+\-*/ \t])*'
+LEFT_SIDE = re.compile(SIDE + r'$')
+RIGHT_SIDE = re.compile(SIDE)
+SIDE_TERM = re.compile(r'\s*([+-]?)\s*(\d+(?:\.\d+)?(?:/\d+)?)?\s*\*?\s*(?:([A-Za-z])(?![A-Za-z]))?\s*')
+
+
+# --- Parsing -------------------------------------------------------------------------------
+
+def _number(token: str):
+    # int() is far cheaper than Fraction() and mixes with Fractions exactly
+    return int(token) if token.lstrip('-').isdigit() else Fraction(token)
+
+
+def _numbers(text: str) -> list:
+    return [_number(n) for n in NUMBER_PATTERN.findall(text)]
+
+
+def parse_matrices(text: str):
+    """Matrices in bracket ([[1,2],[3,4]]) or row ([1 2; 3 4], |1 2; 3 4|) notation"""
+    matrices = []
+    for match in NESTED_MATRIX.finditer(text):
+        rows = [_numbers(row) for row in re.findall(r'\[([^\[\]]*)\]', match.group(1))]
+        matrices.append((match.start(), rows, False))
+    for match in ROW_MATRIX.finditer(text):
+        rows = [_numbers(row) for row in match.group(2).split(';')]
+        matrices.append((match.start(), rows, match.group(1) == '|'))
+    matrices.sort(key=lambda m: m[0])
+    return [(rows, bars) for _, rows, bars in matrices
+            if rows and all(rows) and all(len(row) == len(rows[0]) for row in rows)]
+
+
+def parse_vectors(text: str):
+    """Vectors as (1, 2, 3), <1, 2, 3>, [1, 2, 3] or 2i + 3j - k"""
+    vectors = []
+    for match in BRACKET_VECTOR.finditer(text):
+        vectors.append((match.start(), _numbers(match.group(1))))
+    for match in UNIT_VECTOR.finditer(text):
+        components = {'i': 0, 'j': 0, 'k': 0}
+        for sign, coefficient, unit in UNIT_TERM.findall(match.group(1)):
+            value = _number(coefficient) if coefficient else 1
+            components[unit] += -value if sign == '-' else value
+        vectors.append((match.start(), [components['i'], components['j'], components['k']]))
+    vectors.sort(key=lambda v: v[0])
+    return [vector for _, vector in vectors]
+
+
+def _parse_side(side: str):
+    """'2x - 3 + y' -> ({'x': 2, 'y': 1}, -3), or None if it isn't a linear expression"""
+    side = side.strip()
+    if not side:
+        return None
+    coefficients, constant, position = {}, 0, 0
+    while position < len(side):
+        match = SIDE_TERM.match(side, position)
+        sign, number, variable = match.groups()
+        # Every term needs a number or a variable, and every term after the first a sign
+        if not (number or variable) or (position and not sign):
+            return None
+        value = _number(number) if number else 1
+        value = -value if sign == '-' else value
+        if variable:
+            variable = variable.lower()
+            coefficients[variable] = coefficients.get(variable, 0) + value
+        else:
+            constant += value
+        position = match.end()
+    return coefficients, constant
+
+
+def _parse_equation(clause: str):
+    """(coefficients, rhs) with every variable moved left and every constant right, or None"""
+    if clause.count('=') != 1:
+        return None
+    lhs, rhs = clause.split('=')
+    left_match, right_match = LEFT_SIDE.search(lhs), RIGHT_SIDE.match(rhs)
+    # Only prose may surround the equation: 'x^2 + y' must not be read as '2 + y'
+    before, after = lhs[:left_match.start()].rstrip(), rhs[right_match.end():].lstrip()
+    if before and not (before[-1].isalpha() or before[-1] == ':') or after and not after[0].isalpha():
+        return None
+    left, right = _parse_side(left_match.group()), _parse_side(right_match.group())
+    if left is None or right is None:
+        return None
+    coefficients = dict(left[0])
+    for variable, value in right[0].items():
+        coefficients[variable] = coefficients.get(variable, 0) - value
+    coefficients = {v: c for v, c in coefficients.items() if c != 0}
+    if not coefficients:
+        return None
+    return coefficients, right[1] - left[1]
+
+
+def parse_system(text: str):
+    """
+    Linear equations like '2x + 3y = 5, x - y = 1' -> (A, b, variables)
+    None if any clause with an '=' in it is not a linear equation, rather than solving the rest
+    """
+    equations = []
+    for clause in CLAUSE_SEPARATOR.split(text):
+        if '=' in clause:
+            equation = _parse_equation(clause)
+            if equation is None:
+                return None
+            equations.append(equation)
+
+    variables = sorted({v for coefficients, _ in equations for v in coefficients})
+    # 'x = 2 and y = 3' are values, not a system
+    if len(equations) < 2 or all(len(coefficients) < 2 for coefficients, _ in equations):
+        return None
+    A = [[coefficients.get(v, 0) for v in variables] for coefficients, _ in equations]
+    b = [rhs for _, rhs in equations]
+    return A, b, variables
+
+
+def has_system(text: str) -> bool:
+    """True if the text holds two or more linear equations, e.g. 'x + y = 2, 2x + 2y = 4'"""
+    return text.count('=') >= 2 and parse_system(text) is not None
+
+
+def parse(text: str) -> Optional[Problem]:
+    """Work out what the question asks for and extract its operands"""
+    lowered = text.lower()
+
+    if 'cross' in lowered or 'vector product' in lowered or 'dot' in lowered or 'scalar product' in lowered:
+        vectors = parse_vectors(text)
+        if len(vectors) >= 2 and len(vectors[0]) == len(vectors[1]):
+            u, v = vectors[0], vectors[1]
+            if 'cross' in lowered or 'vector product' in lowered:
+                if len(u) == 3:
+                    return Problem('cross', (u, v), f"{format_vector(u)} × {format_vector(v)}")
+            else:
+                return Problem('dot', (u, v), f"{format_vector(u)} · {format_vector(v)}")
+
+    # The equation pattern is the slowest one here: only run it when there is an equation
+    system = parse_system(text) if '=' in text else None
+    if system is not None:
+        A, b, variables = system
+        return Problem('solve', (A, b, variables), f"{len(A)} equations in {', '.join(variables)}")
+
+    matrices = parse_matrices(text)
+    if matrices:
+        rows, bars = matrices[0]
+        square = len(rows) == len(rows[0])
+        if 'inverse' in lowered and square:
+            return Problem('inverse', (rows,), f"A⁻¹ for A = {format_matrix(rows)}")
+        if 'rank' in lowered:
+            return Problem('rank', (rows,), f"rank of {format_matrix(rows)}")
+        if ('determinant' in lowered or re.search(r'\bdet\b', lowered) or bars) and square:
+            return Problem('determinant', (rows,), f"det {format_matrix(rows)}")
+
+    return None
+
+
+# --- Exact arithmetic ----------------------------------------------------------------------
+
+def _row_reduce(matrix):
+    """Reduced row echelon form over Fractions: (rref, pivot_columns, determinant_factor)"""
+    M = [[Fraction(x) for x in row] for row in matrix]
+    rows, cols = len(M), len(M[0])
+    pivots, factor, r = [], Fraction(1), 0
+    for c in range(cols):
+        pivot = next((i for i in range(r, rows) if M[i][c] != 0), None)
+        if pivot is None:
+            continue
+        if pivot != r:
+            M[r], M[pivot] = M[pivot], M[r]
+            factor = -factor
+        p = M[r][c]
+        factor *= p
+        M[r] = [x / p for x in M[r]]
+        for i in range(rows):
+            if i != r and M[i][c] != 0:
+                scale = M[i][c]
+                M[i] = [a - scale * b for a, b in zip(M[i], M[r])]
+        pivots.append(c)
+        r += 1
+        if r == rows:
+            break
+    return M, pivots, factor
+
+
+def determinant(matrix) -> Fraction:
+    n = len(matrix)
+    _, pivots, factor = _row_reduce(matrix)
+    return factor if len(pivots) == n else Fraction(0)
+
+
+def inverse(matrix):
+    n = len(matrix)
+    augmented = [list(row) + [Fraction(int(i == j)) for j in range(n)] for i, row in enumerate(matrix)]
+    reduced, pivots, _ = _row_reduce(augmented)
+    if pivots[:n] != list(range(n)):
+        raise ValueError("Matrix is singular, so it has no inverse")
+    return [row[n:] for row in reduced]
+
+
+def rank(matrix) -> int:
+    return len(_row_reduce(matrix)[1])
+
+
+def solve_system(A, b):
+    """Returns ('unique', x), ('infinite', None) or ('inconsistent', None)"""
+    n = len(A[0])
+    reduced, pivots, _ = _row_reduce([list(row) + [rhs] for row, rhs in zip(A, b)])
+    if n in pivots:
+        return 'inconsistent', None
+    if len(pivots) < n:
+        return 'infinite', None
+    return 'unique', [reduced[i][n] for i in range(n)]
+
+
+def dot(u, v) -> Fraction:
+    return sum((a * b for a, b in zip(u, v)), Fraction(0))
+
+
+def cross(u, v):
+    return [u[1] * v[2] - u[2] * v[1], u[2] * v[0] - u[0] * v[2], u[0] * v[1] - u[1] * v[0]]
+
+
+def _solve_exact(problem: Problem) -> Answer:
+    kind, operands = problem.kind, problem.operands
+    if kind == 'determinant':
+        value = determinant(operands[0])
+        steps = ["Reduce to upper-triangular form by row operations",
+                 "det = (product of pivots) × (-1)^(row swaps)", f"det = {format_number(value)}"]
+    elif kind == 'inverse':
+        value = inverse(operands[0])
+        steps = ["Row-reduce [A | I] to [I | A⁻¹]", f"A⁻¹ = {format_matrix(value)}"]
+    elif kind == 'rank':
+        value = rank(operands[0])
+        steps = ["Row-reduce to echelon form", f"Number of non-zero rows = {value}"]
+    elif kind == 'solve':
+        A, b, variables = operands
+        status, solution = solve_system(A, b)
+        if status == 'unique':
+            value = dict(zip(variables, solution))
+            answer = ', '.join(f"{v} = {format_number(x)}" for v, x in value.items())
+        else:
+            value = status
+            answer = SYSTEM_OUTCOMES[status]
+        steps = [f"Augmented matrix [A | b] = {format_matrix([row + [r] for row, r in zip(A, b)])}",
+                 "Row-reduce to reduced echelon form", answer]
+    elif kind == 'dot':
+        value = dot(*operands)
+        u, v = operands
+        steps = [" + ".join(f"({format_number(a)})({format_number(b)})" for a, b in zip(u, v)),
+                 f"= {format_number(value)}"]
+    else:  # cross
+        value = cross(*operands)
+        steps = ["u × v = (u₂v₃ - u₃v₂, u₃v₁ - u₁v₃, u₁v₂ - u₂v₁)", f"= {format_vector(value)}"]
+    return Answer(kind, problem.expression, value, steps)
+
+
+# --- Batched NumPy path for larger problems ------------------------------------------------
+
+def _integral(operands) -> bool:
+    """True if every number in (nested lists of) operands is an int"""
+    return all(_integral(x) if isinstance(x, list) else isinstance(x, int) for x in operands)
+
+
+def _exact(value, denominator: int):
+    """
+    value × denominator rounded to integers and divided back out as Fractions, or None
+    if any entry is not within ROUNDING_TOLERANCE of a whole multiple of 1/denominator,
+    or is too large (EXACT_ROUNDING_LIMIT) for that closeness to mean anything
+    """
+    scaled = np.asarray(value) * denominator
+    whole = np.rint(scaled)
+    if not np.all(np.abs(scaled) < EXACT_ROUNDING_LIMIT) or not np.all(np.abs(scaled - whole) <= ROUNDING_TOLERANCE):
+        return None
+    if whole.ndim == 0:
+        return Fraction(int(whole), denominator)
+    return [_exact_list(row, denominator) for row in whole.tolist()] if whole.ndim == 2 \
+        else _exact_list(whole.tolist(), denominator)
+
+
+def _exact_list(row, denominator: int):
+    return [Fraction(int(x), denominator) for x in row]
+
+
+def _solve_numeric_batch(kind: str, problems: List[Problem]) -> List[Answer]:
+    """
+    Same-kind, same-shape problems stacked into one array and solved in one call
+    Results for integer input are rounded back to exact values where they provably fit
+    (integers for det, dot and cross; fractions over det for inverses and systems), and
+    otherwise solved again by exact elimination
+    """
+    determinants = None
+    if kind in ('dot', 'cross'):
+        U = np.array([p.operands[0] for p in problems], dtype=float)
+        V = np.array([p.operands[1] for p in problems], dtype=float)
+        values = np.einsum('ij,ij->i', U, V) if kind == 'dot' else np.cross(U, V)
+    elif kind == 'solve':
+        A = np.array([p.operands[0] for p in problems], dtype=float)
+        b = np.array([p.operands[1] for p in problems], dtype=float)
+        values = np.linalg.solve(A, b[..., None])[..., 0]
+        determinants = np.linalg.det(A)
+    else:
+        stack = np.array([p.operands[0] for p in problems], dtype=float)
+        if kind == 'determinant':
+            values = np.linalg.det(stack)
+        elif kind == 'inverse':
+            values = np.linalg.inv(stack)
+            determinants = np.linalg.det(stack)
+        else:
+            values = np.linalg.matrix_rank(stack)
+
+    answers = []
+    for p, (problem, value) in enumerate(zip(problems, values)):
+        exact = None
+        if kind != 'rank' and _integral(problem.operands[:2]):
+            if kind in ('determinant', 'dot', 'cross'):
+                exact = _exact(value, 1)
+            elif round(determinants[p]) == 0:
+                # An integer det below 1/2 is 0: LAPACK's answer is noise, say why there is none
+                answers.append(_solve_exact_or_explain(problem))
+                continue
+            elif abs(round(determinants[p])) <= MAX_EXACT_DENOMINATOR:
+                exact = _exact(value, abs(int(round(determinants[p]))) or 1)
+            if exact is None:
+                answers.append(_solve_exact_or_explain(problem))
+                continue
+        if exact is None:
+            value, steps = value.tolist(), ["Solved numerically (floating point)"]
+        else:
+            value, steps = exact, ["Solved numerically, then rounded to the exact value (integer input)"]
+            if kind in ('determinant', 'dot'):
+                value = int(value) if value.denominator == 1 else value
+        if kind == 'solve':
+            value = dict(zip(problem.operands[2], value))
+        answers.append(Answer(kind, problem.expression, value, steps))
+    return answers
+
+
+def _is_exact(problem: Problem) -> bool:
+    if problem.kind in ('dot', 'cross'):
+        return True
+    rows = problem.operands[0]
+    # A system that isn't square has no unique solution; elimination says which case it is
+    if problem.kind == 'solve' and len(rows) != len(rows[0]):
+        return True
+    return len(rows) <= EXACT_MAX_SIZE
+
+
+def _shape_key(problem: Problem):
+    if problem.kind in ('dot', 'cross'):
+        return problem.kind, len(problem.operands[0])
+    return problem.kind, len(problem.operands[0]), len(problem.operands[0][0])
+
+
+def _solve_exact_or_explain(problem: Problem) -> Answer:
+    try:
+        return _solve_exact(problem)
+    except ValueError as e:
+        return Answer(problem.kind, problem.expression, None, [str(e)])
+
+
+def solve_problems(problems: List[Optional[Problem]]) -> List[Optional[Answer]]:
+    """
+    Solve parsed problems: small ones exactly, larger ones grouped by kind and
+    shape into stacked NumPy arrays so each group is one vectorized call
+    """
+    answers = [None] * len(problems)
+    groups = {}
+
+    for i, problem in enumerate(problems):
+        if problem is None:
+            continue
+        if _is_exact(problem):
+            answers[i] = _solve_exact_or_explain(problem)
+        else:
+            groups.setdefault(_shape_key(problem), []).append(i)
+
+    for (kind, *_), indices in groups.items():
+        try:
+            batch = _solve_numeric_batch(kind, [problems[i] for i in indices])
+        except np.linalg.LinAlgError:
+            # One singular matrix fails the whole stack: fall back to one at a time, and
+            # let exact elimination explain the singular ones (no inverse, no unique solution)
+            batch = []
+            for i in indices:
+                try:
+                    batch.extend(_solve_numeric_batch(kind, [problems[i]]))
+                except np.linalg.LinAlgError:
+                    batch.append(_solve_exact_or_explain(problems[i]))
+        for i, answer in zip(indices, batch):
+            answers[i] = answer
+
+    return answers
+
+
+def evaluate_batch(texts: Iterable[str]) -> List[Optional[Answer]]:
+    """Answer many questions, batching the NumPy work across all of them"""
+    return solve_problems([parse(text) for text in texts])
+
+
+def evaluate(text: str) -> Optional[Answer]:
+    """Answer one linear algebra question, or None if it isn't recognized"""
+    return evaluate_batch([text])[0]
+
+
+# --- Formatting ----------------------------------------------------------------------------
+
+def format_number(x) -> str:
+    if isinstance(x, Fraction) and x.denominator == 1:
+        return str(x.numerator)
+    if isinstance(x, float):
+        return f"{x:.6g}"
+    return str(x)
+
+
+def format_vector(v) -> str:
+    return "(" + ", ".join(format_number(x) for x in v) + ")"
+
+
+def format_matrix(rows) -> str:
+    if len(rows) > EXACT_MAX_SIZE:
+        return f"a {len(rows)}×{len(rows[0])} matrix"
+    return "[" + "; ".join(" ".join(format_number(x) for x in row) for row in rows) + "]"
+
+
+def format_value(answer: Answer) -> str:
+    value = answer.value
+    if value is None:
+        return answer.steps[-1]
+    if answer.kind == 'inverse':
+        return format_matrix(value)
+    if answer.kind == 'cross':
+        return format_vector(value)
+    if isinstance(value, dict):
+        return ", ".join(f"{v} = {format_number(x)}" for v, x in value.items())
+    if isinstance(value, str):
+        return SYSTEM_OUTCOMES[value]
+    return format_number(value)
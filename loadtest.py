@@ -0,0 +1,393 @@
+# Load generator and saturation report for the JEE AI Solver API
+# Starts app.py on a free local port (or targets --url), drives /solve, /api/stats and /health
+# with a weighted mix over a concurrency ramp, and reports throughput, latency percentiles,
+# error rate and the knee: the concurrency after which latency stops scaling linearly.
+# The JSON report has stable keys so runs from two versions can be diffed.
+#
+# Usage:
+#   python loadtest.py --ramp 1,2,4,8,16,32 --duration 10 --report benchmarks/results/run.json
+#   python loadtest.py --url http://staging:5000 --mix solve=6,stats=1,health=3
+#   python loadtest.py --corpus questions.jsonl --vary --baseline previous_report.json
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SERVERS = {
+    'flask': [sys.executable, 'app.py'],
+    'asgi': [sys.executable, 'asgi_app.py']
+}
+
+ENDPOINTS = {
+    'solve': ('POST', '/solve'),
+    'stats': ('GET', '/api/stats'),
+    'health': ('GET', '/health')
+}
+
+DEFAULT_CORPUS = [
+    {'question': "A car accelerates from rest at 2 m/s² for 10 s. Find its final velocity.", 'subject': 'physics'},
+    {'question': "A ball is thrown vertically upward with initial velocity 20 m/s. Find the maximum height.",
+     'subject': 'physics'},
+    {'question': "Find the current through a 10 ohm resistor connected to a 5 V battery.", 'subject': 'physics'},
+    {'question': "Calculate the molarity of 40g NaOH in 500 mL solution.", 'subject': 'chemistry'},
+    {'question': "What is the pH of a 0.01 M HCl solution?", 'subject': 'chemistry'},
+    {'question': "Balance the reaction of H2 with O2 to form water.", 'subject': 'chemistry'},
+    {'question': "Find the derivative of x³ + 2x² - 5x + 1", 'subject': 'mathematics'},
+    {'question': "Evaluate the integral of x e^x dx from 0 to 1", 'subject': 'mathematics'},
+    {'question': "Find the limit of (1 - cos x)/x^2 as x -> 0", 'subject': 'mathematics'},
+    {'question': "Find the inverse of the matrix [[2, 1], [5, 3]]", 'subject': 'mathematics'},
+    {'question': "In how many ways can we choose 3 students from 10?", 'subject': 'mathematics'},
+    {'question': "A coin is tossed 10 times. Find the probability of exactly 4 heads in 10 tosses.",
+     'subject': 'mathematics'}
+]
+
+# Knee detection: latency this many times the lowest-concurrency p95, or throughput
+# growing by less than this fraction from one step to the next
+KNEE_LATENCY_FACTOR = 2.0
+KNEE_MIN_GAIN = 0.1
+
+
+def parse_mix(text: str) -> dict:
+    """'solve=8,stats=1,health=1' -> {'solve': 8.0, ...}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("The mix needs at least one positive weight")
+    return mix
+
+
+def parse_ramp(text: str) -> list:
+    levels = [int(level) for level in text.split(',')]
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError("Concurrency levels must be positive integers")
+    return levels
+
+
+def load_corpus(path: str) -> list:
+    """Questions from a JSONL file in batch_solve.py's input format, or the built-in set"""
+    if not path:
+        return DEFAULT_CORPUS
+    corpus = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                corpus.append({'question': record['question'], 'subject': record.get('subject', 'physics')})
+    if not corpus:
+        raise SystemExit(f"❌ No questions in {path}")
+    return corpus
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_health(host: str, port: int, timeout: float = 60, process=None):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on {host}:{port} did not become healthy within {timeout:.0f}s")
+
+
+def start_server(server: str, port: int):
+    """Run the server as a child process with the current environment (JEE_* settings apply)"""
+    env = dict(os.environ, PORT=str(port), FLASK_DEBUG='false')
+    process = subprocess.Popen(SERVERS[server], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_health('127.0.0.1', port, process=process)
+    except Exception:
+        process.kill()
+        raise
+    return process
+
+
+def fetch_json(host: str, port: int, path: str):
+    try:
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        conn.request('GET', path)
+        response = conn.getresponse()
+        return json.loads(response.read()) if response.status == 200 else None
+    except (OSError, ValueError):
+        return None
+
+
+def percentile(sorted_samples: list, fraction: float):
+    if not sorted_samples:
+        return None
+    return sorted_samples[min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """Throughput, error rate and latency percentiles (ms) for (latency, status) samples"""
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, status in samples if status != 200)
+    rejected = sum(1 for _, status in samples if status == 429)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'rejected_429': rejected,
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'max_ms': ms(latencies[-1] if latencies else None)
+    }
+
+
+class LoadWorker(threading.Thread):
+    """Closed-loop client: one request at a time on its own keep-alive connection"""
+
+    def __init__(self, host, port, mix, corpus, vary, stop_at, seed):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.endpoints, self.weights = list(mix), list(mix.values())
+        self.corpus = corpus
+        self.vary = vary
+        self.stop_at = stop_at
+        self.random = random.Random(seed)
+        self.samples = {name: [] for name in mix}
+        self.failures = {}
+
+    def request(self, conn, name):
+        method, path = ENDPOINTS[name]
+        body, headers = None, {}
+        if name == 'solve':
+            record = self.random.choice(self.corpus)
+            question = record['question']
+            if self.vary:
+                # Defeats request coalescing and caching so every solve does real work
+                question = f"{question} (#{self.random.getrandbits(32)})"
+            body = json.dumps({'question': question, 'subject': record['subject']})
+            headers['Content-Type'] = 'application/json'
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        while time.perf_counter() < self.stop_at:
+            name = self.random.choices(self.endpoints, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                status = self.request(conn, name)
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                self.failures[status] = self.failures.get(status, 0) + 1
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self.samples[name].append((time.perf_counter() - start, status))
+        conn.close()
+
+
+def default_report_path() -> str:
+    """A report file of its own in the temp directory, so runs never overwrite each other"""
+    name = f"jee-loadtest-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json"
+    return os.path.join(tempfile.gettempdir(), name)
+
+
+def run_step(host, port, concurrency, duration, mix, corpus, vary, seed) -> dict:
+    """Hold `concurrency` clients busy for `duration` seconds and summarize what they saw"""
+    stop_at = time.perf_counter() + duration
+    workers = [LoadWorker(host, port, mix, corpus, vary, stop_at, seed * 1000 + i) for i in range(concurrency)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    by_endpoint = {name: [s for worker in workers for s in worker.samples[name]] for name in mix}
+    failures = {}
+    for worker in workers:
+        for kind, count in worker.failures.items():
+            failures[kind] = failures.get(kind, 0) + count
+
+    step = {'concurrency': concurrency, 'duration_s': round(elapsed, 2)}
+    step.update(summarize([s for samples in by_endpoint.values() for s in samples], elapsed))
+    step['endpoints'] = {name: summarize(samples, elapsed) for name, samples in by_endpoint.items()}
+    step['connection_failures'] = failures
+    return step
+
+
+def find_knee(steps: list) -> dict:
+    """
+    Last concurrency before latency goes nonlinear: the next step either pushed p95 past
+    KNEE_LATENCY_FACTOR × the lowest-concurrency p95, or added almost no throughput
+    """
+    usable = [s for s in steps if s['requests'] and s['p95_ms'] is not None]
+    if len(usable) < 2:
+        return {'concurrency': None, 'reason': 'need at least two ramp steps with traffic'}
+
+    base_p95 = usable[0]['p95_ms']
+    for previous, step in zip(usable, usable[1:]):
+        if step['p95_ms'] > KNEE_LATENCY_FACTOR * base_p95:
+            return {'concurrency': previous['concurrency'],
+                    'reason': f"p95 {step['p95_ms']} ms at concurrency {step['concurrency']} is over "
+                              f"{KNEE_LATENCY_FACTOR:g}× the baseline {base_p95} ms"}
+        growth = step['concurrency'] / previous['concurrency']
+        if growth > 1 and step['throughput_rps'] < (1 + KNEE_MIN_GAIN) * previous['throughput_rps']:
+            return {'concurrency': previous['concurrency'],
+                    'reason': f"throughput went from {previous['throughput_rps']} to {step['throughput_rps']} rps "
+                              f"while concurrency grew {growth:g}×"}
+    return {'concurrency': None, 'reason': f"not reached up to concurrency {usable[-1]['concurrency']}"}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_step(step: dict):
+    print(f"  c={step['concurrency']:>4}  {step['throughput_rps']:>9.1f} rps  "
+          f"p50 {step['p50_ms'] or 0:>8.1f} ms  p95 {step['p95_ms'] or 0:>8.1f} ms  "
+          f"p99 {step['p99_ms'] or 0:>8.1f} ms  errors {step['error_rate'] * 100:5.1f}%")
+
+
+def compare(report: dict, baseline_path: str):
+    """Per-concurrency throughput and p95 change against an earlier report"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {step['concurrency']: step for step in baseline.get('steps', [])}
+    print(f"\n📊 Compared with {baseline_path} (revision {baseline.get('meta', {}).get('revision')}):")
+    for step in report['steps']:
+        old = previous.get(step['concurrency'])
+        if not old or not old['throughput_rps'] or not old['p95_ms'] or step['p95_ms'] is None:
+            continue
+        throughput = (step['throughput_rps'] / old['throughput_rps'] - 1) * 100
+        p95 = (step['p95_ms'] / old['p95_ms'] - 1) * 100
+        print(f"  c={step['concurrency']:>4}  throughput {throughput:+6.1f}%  p95 {p95:+6.1f}%")
+    print(f"  knee: {baseline.get('knee', {}).get('concurrency')} -> {report['knee']['concurrency']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the JEE AI Solver API and find its saturation point')
+    parser.add_argument('--url', help='test a running server instead of starting one')
+    parser.add_argument('--server', choices=sorted(SERVERS), default='flask',
+                        help='server to start when --url is not given (default: flask, i.e. app.py)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('solve=8,stats=1,health=1'),
+                        help='weighted endpoint mix (default: solve=8,stats=1,health=1)')
+    parser.add_argument('--ramp', type=parse_ramp, default=parse_ramp('1,2,4,8,16,32'),
+                        help='comma-separated concurrency levels (default: 1,2,4,8,16,32)')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per ramp step (default: 10)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='seconds of single-client warm-up (default: 2)')
+    parser.add_argument('--corpus', help='JSONL questions ({"question": ..., "subject": ...}); default: built-in set')
+    parser.add_argument('--vary', action='store_true', help='make every question unique to defeat coalescing')
+    parser.add_argument('--stop-on-errors', type=float, default=0.5,
+                        help='stop the ramp once a step\'s error rate exceeds this fraction (default: 0.5)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report', help='JSON report path (default: jee-loadtest-<time>-<pid>.json in '
+                                          'the temp directory)')
+    parser.add_argument('--baseline', help='earlier JSON report to compare against')
+    args = parser.parse_args()
+    args.report = args.report or default_report_path()
+
+    corpus = load_corpus(args.corpus)
+    process = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+        wait_for_health(host, port)
+    else:
+        host, port = '127.0.0.1', free_port()
+        print(f"🚀 Starting {args.server} server on port {port}...")
+        process = start_server(args.server, port)
+
+    try:
+        print(f"🎯 Target: http://{host}:{port}  mix: {args.mix}  corpus: {len(corpus)} questions")
+        steps = []
+        interrupted = False
+        try:
+            if args.warmup > 0:
+                run_step(host, port, 1, args.warmup, args.mix, corpus, args.vary, args.seed)
+
+            for concurrency in args.ramp:
+                step = run_step(host, port, concurrency, args.duration, args.mix, corpus, args.vary, args.seed)
+                steps.append(step)
+                print_step(step)
+                if step['error_rate'] > args.stop_on_errors:
+                    print(f"🛑 Error rate {step['error_rate'] * 100:.0f}% - stopping the ramp")
+                    break
+        except KeyboardInterrupt:
+            # Keep what was measured: the step in progress is dropped, finished ones are reported
+            interrupted = True
+            print(f"🛑 Interrupted - reporting the {len(steps)} completed step(s)")
+
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'target': args.url or f"local {args.server} ({SERVERS[args.server][-1]})",
+                'mix': args.mix,
+                'ramp': args.ramp,
+                'duration_s': args.duration,
+                'corpus_size': len(corpus),
+                'vary': args.vary,
+                'interrupted': interrupted,
+                'env': {key: value for key, value in sorted(os.environ.items()) if key.startswith('JEE_')}
+            },
+            'steps': steps,
+            'knee': find_knee(steps),
+            'server_stats': fetch_json(host, port, '/api/stats')
+        }
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    knee = report['knee']
+    if knee['concurrency'] is not None:
+        print(f"📈 Knee at concurrency {knee['concurrency']}: {knee['reason']}")
+    else:
+        print(f"📈 No knee found: {knee['reason']}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True, ensure_ascii=False)
+    print(f"📝 Report written to {args.report}")
+
+    if args.baseline:
+        compare(report, args.baseline)
+    if interrupted:
+        sys.exit(130)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# Per-worker memory report: unique memory (USS) with and without preloading
+# By default this measures what gunicorn workers serve: app.py's JEESolver, knowledge base and
+# classifier. --model measures the JEEWebSolver model instead (JEE_PRELOAD=true deployments).
+# Usage: python memory_report.py [workers] [--model]
+
+import gc
+import json
+import multiprocessing
+import sys
+from typing import Dict
+
+SAMPLE_QUESTION = "A ball is thrown vertically upward with initial velocity 20 m/s. Find the maximum height reached."
+
+
+def process_memory(pid: int = None) -> Dict:
+    """
+    Memory of a process in bytes from /proc (Linux)
+    USS = private pages only, i.e. what the process would free on exit
+    """
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    fields = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].endswith(':') and parts[2] == 'kB':
+                fields[parts[0][:-1]] = int(parts[1]) * 1024
+
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    }
+
+
+def _serve_one(model: bool):
+    """Answer the sample question the way a worker would (importing whatever is not loaded yet)"""
+    if model:
+        from jee_ai_model import get_shared_solver
+        get_shared_solver().solve_problem(SAMPLE_QUESTION)
+    else:
+        import app
+        app.solver.solve_physics(app.prepare(SAMPLE_QUESTION, 'physics'))
+
+
+def _worker(conn, model: bool):
+    """Serve one question and report memory"""
+    gc.enable()
+    _serve_one(model)
+    gc.collect()
+    conn.send(process_memory())
+    conn.close()
+
+
+def _preload(model: bool):
+    """What gunicorn's master does before forking (see gunicorn.conf.py on_starting)"""
+    gc.disable()
+    if model:
+        from jee_ai_model import preload
+        preload()
+    else:
+        import app  # noqa: F401 - preload_app imports the app in the master
+    gc.collect()
+    gc.freeze()
+
+
+def measure(workers: int, preloaded: bool, model: bool) -> dict:
+    """Fork workers and collect their memory after each has served a request"""
+    if preloaded:
+        _preload(model)
+
+    ctx = multiprocessing.get_context('fork')
+    pipes, processes = [], []
+    for _ in range(workers):
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(target=_worker, args=(child_conn, model))
+        process.start()
+        pipes.append(parent_conn)
+        processes.append(process)
+
+    reports = [conn.recv() for conn in pipes]
+    for process in processes:
+        process.join()
+
+    return {
+        'preloaded': preloaded,
+        'workers': reports,
+        'total_uss_mb': round(sum(r['uss'] for r in reports) / 2**20, 1),
+        'mean_uss_mb': round(sum(r['uss'] for r in reports) / len(reports) / 2**20, 1)
+    }
+
+
+if __name__ == "__main__":
+    arguments = [a for a in sys.argv[1:] if a != '--model']
+    model = '--model' in sys.argv[1:]
+    workers = int(arguments[0]) if arguments else 2
+
+    # Measure without preloading first: preloading freezes the parent's heap for good
+    report = {
+        'target': 'JEEWebSolver model' if model else 'app (JEESolver)',
+        'without_preload': measure(workers, preloaded=False, model=model),
+        'with_preload': measure(workers, preloaded=True, model=model)
+    }
+
+    print(json.dumps(report, indent=2))
+    print(f"📉 Mean worker USS: {report['without_preload']['mean_uss_mb']} MB without preload, "
+          f"{report['with_preload']['mean_uss_mb']} MB with preload")
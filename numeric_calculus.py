@@ -0,0 +1,545 @@
+# Numeric definite integrals and limits, as a cross-check on symbolic answers
+# Integrands are parsed with a whitelist over the ast and compiled once into a NumPy
+# expression; every evaluation is then one vectorized call over many points. Integrals use
+# adaptive Gauss–Kronrod (G7K15), limits use Richardson extrapolation, and both work on
+# batches of problems and report an error estimate with every value.
+
+import ast
+import math
+import re
+from collections import namedtuple
+from fractions import Fraction
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+# Integration tolerances and work limits (per problem)
+ABS_TOL = 1e-10
+REL_TOL = 1e-10
+MAX_ROUNDS = 40
+MAX_INTERVALS = 2000
+# Limits: number of points in each one-sided sequence, and the accepted relative error
+LIMIT_STEPS = 20
+LIMIT_TOL = 1e-6
+SAFE = 2.0
+# An estimate is always shown when its error is this small (relative to the value, if above 1)
+TRUSTED_ERROR = 1e-6
+UNDETERMINED = {
+    'integral': 'diverges (numerically undetermined)',
+    'limit': 'limit does not exist (numerically undetermined)'
+}
+# Deepest expression nesting accepted (unary chains, brackets, calls)
+MAX_DEPTH = 60
+
+Problem = namedtuple('Problem', ['kind', 'expression', 'variable', 'function', 'args'])
+Estimate = namedtuple('Estimate', ['kind', 'expression', 'value', 'error', 'converged', 'note'])
+
+# --- Safe expression compiler --------------------------------------------------------------
+
+FUNCTIONS = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'sec': lambda x: 1 / np.cos(x), 'csc': lambda x: 1 / np.sin(x), 'cosec': lambda x: 1 / np.sin(x),
+    'cot': lambda x: 1 / np.tan(x),
+    'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan,
+    'arcsin': np.arcsin, 'arccos': np.arccos, 'arctan': np.arctan,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'exp': np.exp, 'log': np.log, 'log10': np.log10, 'log2': np.log2,
+    'sqrt': np.sqrt, 'abs': np.abs
+}
+CONSTANTS = {'pi': np.pi, 'e': np.e, 'inf': np.inf}
+OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+FUNCTION_NAMES = '|'.join(sorted(FUNCTIONS, key=len, reverse=True))
+
+UNICODE = str.maketrans({'π': 'pi', '√': 'sqrt', '∞': 'inf', '−': '-', '×': '*', '·': '*',
+                         '²': '^2', '³': '^3', '→': '->'})
+
+
+def normalize_expression(expr: str) -> str:
+    """Question-style maths ('2x sin x', 'e^(-x²)', 'ln x') -> Python syntax"""
+    s = expr.strip().lower().translate(UNICODE).replace('^', '**')
+    s = re.sub(r'\bln\b', 'log', s)
+    # |x - 1| -> abs(x - 1), innermost bars first
+    previous = None
+    while previous != s:
+        previous, s = s, re.sub(r'\|([^|]+)\|', r'abs(\1)', s, count=1)
+    # sin^2 x -> (sin(x))**2
+    s = re.sub(rf'\b({FUNCTION_NAMES})\*\*(\d+)\s*(\([^()]*\))', r'(\1\3)**\2', s)
+    s = re.sub(rf'\b({FUNCTION_NAMES})\*\*(\d+)\s*([a-z0-9.]+)', r'(\1(\3))**\2', s)
+    # sin x -> sin(x), sin 2x -> sin(2x)
+    s = re.sub(rf'\b({FUNCTION_NAMES})\s+(\d*\.?\d*[a-z]?(?:\*\*\d+)?)(?![\w(])', r'\1(\2)', s)
+    # Implicit multiplication: 2x, 2(x+1), (x+1)(x-1), x(x+1), x sin(x)
+    s = re.sub(r'(\d|\))\s*(?=[a-z(])', r'\1*', s)
+    s = re.sub(r'\b([a-z]|pi)\s*(?=\()', r'\1*', s)
+    s = re.sub(r'\b([a-z]|pi)\s+(?=[a-z(\d])', r'\1*', s)
+    return s
+
+
+def _check(node, names, depth=0):
+    """Reject anything but arithmetic on numbers, known names and whitelisted functions"""
+    if depth > MAX_DEPTH:
+        raise ValueError("Expression is nested too deeply")
+    depth += 1
+    if isinstance(node, ast.Expression):
+        return _check(node.body, names, depth)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, OPERATORS):
+        return _check(node.left, names, depth) and _check(node.right, names, depth)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, OPERATORS):
+        return _check(node.operand, names, depth)
+    if isinstance(node, ast.Call):
+        if not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS) or node.keywords \
+                or len(node.args) != 1:
+            raise ValueError("Unsupported function call in expression")
+        return _check(node.args[0], names, depth)
+    if isinstance(node, ast.Name):
+        if node.id not in names:
+            raise ValueError(f"Unknown name '{node.id}' in expression")
+        return True
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+            and not isinstance(node.value, bool):
+        return True
+    raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+
+
+class _Float64Constants(ast.NodeTransformer):
+    """
+    Number literals -> _number(literal), i.e. np.float64
+    Python ints would make 9**9**9 an unbounded computation and Python floats raise
+    OverflowError; float64 arithmetic overflows to inf under errstate instead.
+    """
+
+    def visit_Constant(self, node):
+        call = ast.Call(func=ast.Name(id='_number', ctx=ast.Load()),
+                        args=[ast.Constant(float(node.value))], keywords=[])
+        return ast.copy_location(call, node)
+
+
+@lru_cache(maxsize=512)
+def compile_expression(expr: str, variable: str = 'x') -> Callable:
+    """
+    Compile an expression once into a vectorized function of one variable
+    Raises ValueError (or SyntaxError) for anything that isn't plain maths
+    """
+    tree = ast.parse(normalize_expression(expr), mode='eval')
+    _check(tree, set(CONSTANTS) | {variable})
+    tree = ast.fix_missing_locations(_Float64Constants().visit(tree))
+    code = compile(tree, '<expression>', 'eval')
+    namespace = {'__builtins__': {}, **FUNCTIONS, **CONSTANTS, '_number': np.float64}
+
+    def function(x):
+        with np.errstate(all='ignore'):
+            result = eval(code, namespace, {variable: x})
+        return np.broadcast_to(np.asarray(result, dtype=float), np.shape(x))
+
+    return function
+
+
+def evaluate_constant(expr: str) -> float:
+    """Value of a bound or limit point such as 'pi/2', '-inf' or 'e^2'"""
+    return float(compile_expression(expr.strip(), '_')(0.0))
+
+
+# --- Adaptive Gauss–Kronrod quadrature -----------------------------------------------------
+
+# G7K15 abscissae and weights on [-1, 1] (QUADPACK qk15)
+_XGK = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                 0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                 0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                 0.207784955007898467600689403773245, 0.0])
+_WGK = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                 0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                 0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                 0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+_WG = np.array([0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                0.381830050505118944950369775488975, 0.417959183673469387755102040816327])
+
+NODES = np.concatenate([-_XGK[:7], [0.0], _XGK[6::-1]])
+KRONROD_WEIGHTS = np.concatenate([_WGK[:7], [_WGK[7]], _WGK[6::-1]])
+GAUSS_WEIGHTS = np.zeros(15)
+GAUSS_WEIGHTS[[1, 13]], GAUSS_WEIGHTS[[3, 11]], GAUSS_WEIGHTS[[5, 9]], GAUSS_WEIGHTS[7] = _WG
+
+# Infinite ranges are mapped onto a finite t-interval
+FINITE, UPPER_INFINITE, LOWER_INFINITE, BOTH_INFINITE = range(4)
+
+
+def _map_range(a: float, b: float):
+    """(mode, anchor, t_lo, t_hi) for integrating over [a, b] with a < b"""
+    if math.isinf(a) and math.isinf(b):
+        return BOTH_INFINITE, 0.0, -1.0, 1.0
+    if math.isinf(b):
+        return UPPER_INFINITE, a, 0.0, 1.0
+    if math.isinf(a):
+        return LOWER_INFINITE, b, 0.0, 1.0
+    return FINITE, 0.0, a, b
+
+
+def _substitute(T, mode, anchor):
+    """x(t) and dx/dt for each interval's nodes, by that interval's range mapping"""
+    mode, anchor = mode[:, None], anchor[:, None]
+    with np.errstate(all='ignore'):
+        X = np.select([mode == UPPER_INFINITE, mode == LOWER_INFINITE, mode == BOTH_INFINITE],
+                      [anchor + T / (1 - T), anchor - (1 - T) / T, T / (1 - T ** 2)], T)
+        J = np.select([mode == UPPER_INFINITE, mode == LOWER_INFINITE, mode == BOTH_INFINITE],
+                      [1 / (1 - T) ** 2, 1 / T ** 2, (1 + T ** 2) / (1 - T ** 2) ** 2], np.ones_like(T))
+    return X, J
+
+
+def integrate_batch(problems: List[tuple]) -> List[tuple]:
+    """
+    Integrate many (function, a, b) problems together
+    Returns (value, error_estimate, converged, evaluations) for each. Each round evaluates
+    every pending interval of every problem, with one vectorized call per distinct function.
+    """
+    count = len(problems)
+    functions, function_ids = [], []
+    mode, anchor, sign, span = np.zeros(count, int), np.zeros(count), np.ones(count), np.ones(count)
+    owners, lows, highs = [], [], []
+
+    for p, (function, a, b) in enumerate(problems):
+        if function not in functions:
+            functions.append(function)
+        function_ids.append(functions.index(function))
+        if a > b:
+            a, b, sign[p] = b, a, -1.0
+        if a == b:
+            continue
+        mode[p], anchor[p], lo, hi = _map_range(a, b)
+        span[p] = hi - lo
+        owners.append(p)
+        lows.append(lo)
+        highs.append(hi)
+
+    function_ids = np.array(function_ids, dtype=int)
+    failed = np.zeros(count, bool)
+    owner, lo, hi = np.array(owners, dtype=int), np.array(lows), np.array(highs)
+    value, error = np.zeros(count), np.zeros(count)
+    evaluations, converged = np.zeros(count, int), np.ones(count, bool)
+
+    for round_number in range(MAX_ROUNDS):
+        if owner.size == 0:
+            break
+        center, half = (lo + hi) / 2, (hi - lo) / 2
+        T = center[:, None] + half[:, None] * NODES
+        F = np.empty_like(T)
+        interval_functions = function_ids[owner]
+        for f in np.unique(interval_functions):
+            rows = np.nonzero(interval_functions == f)[0]
+            X, J = _substitute(T[rows], mode[owner[rows]], anchor[owner[rows]])
+            try:
+                with np.errstate(all='ignore'):
+                    F[rows] = functions[f](X) * J
+            except Exception:
+                # One bad integrand must not sink the rest of the batch
+                F[rows] = np.nan
+                failed[owner[rows]] = True
+
+        with np.errstate(all='ignore'):
+            kronrod = half * (F @ KRONROD_WEIGHTS)
+            gauss = half * (F @ GAUSS_WEIGHTS)
+            err = np.abs(kronrod - gauss)
+        evaluations += np.bincount(owner, minlength=count) * 15
+
+        # A problem is done once its total error is within tolerance; until then each
+        # interval must meet its width's share of the tolerance or be bisected
+        estimate = value + np.bincount(owner, weights=kronrod, minlength=count)
+        problem_tolerance = np.maximum(ABS_TOL, REL_TOL * np.abs(estimate))
+        total_error = error + np.bincount(owner, weights=err, minlength=count)
+        settled = (total_error <= problem_tolerance)[owner]
+        tolerance = problem_tolerance[owner] * (hi - lo) / span[owner]
+        within = settled | (err <= tolerance)
+        finite = np.isfinite(kronrod)
+        crowded = (np.bincount(owner, minlength=count) > MAX_INTERVALS)[owner]
+        accept = within | ~finite | crowded | (round_number == MAX_ROUNDS - 1)
+
+        done = owner[accept]
+        np.add.at(value, done, kronrod[accept])
+        np.add.at(error, done, np.where(finite[accept], err[accept], np.inf))
+        converged[owner[accept & ~within]] = False
+
+        # Bisect the rest
+        split = ~accept
+        middle = center[split]
+        owner = np.concatenate([owner[split], owner[split]])
+        lo, hi = np.concatenate([lo[split], middle]), np.concatenate([middle, hi[split]])
+
+    value *= sign
+    value[failed], error[failed], converged[failed] = np.nan, np.inf, False
+    return [(float(value[p]), float(error[p]), bool(converged[p]), int(evaluations[p])) for p in range(count)]
+
+
+def integrate(function: Callable, a: float, b: float) -> tuple:
+    """(value, error_estimate, converged, evaluations) for one definite integral"""
+    return integrate_batch([(function, a, b)])[0]
+
+
+# --- Limits by Richardson extrapolation ----------------------------------------------------
+
+def _sample_points(point: float, side: int) -> tuple:
+    """Points approaching the limit point from one side, and their step sizes h -> 0"""
+    h = 2.0 ** -np.arange(LIMIT_STEPS)
+    if math.isinf(point):
+        return math.copysign(4.0, point) / h, h
+    scale = 0.25 * max(1.0, abs(point))
+    return point + side * scale * h, h
+
+
+def _richardson(S):
+    """
+    Extrapolate rows of sequences S[:, n] (step halving each n) to h = 0
+    Ridders' scheme: Neville tableau row by row, keeping the entry whose neighbours agree
+    best, and freezing a problem once round-off makes the new row clearly worse
+    """
+    count, steps = S.shape
+    previous = S[:, :1]
+    best, best_error = S[:, 0].copy(), np.full(count, np.inf)
+    active = np.ones(count, bool)
+    with np.errstate(all='ignore'):
+        for n in range(1, steps):
+            row = np.empty((count, n + 1))
+            row[:, 0] = S[:, n]
+            for k in range(1, n + 1):
+                row[:, k] = row[:, k - 1] + (row[:, k - 1] - previous[:, k - 1]) / (2.0 ** k - 1)
+                err = np.maximum(np.abs(row[:, k] - row[:, k - 1]), np.abs(row[:, k] - previous[:, k - 1]))
+                better = active & (np.nan_to_num(err, nan=np.inf) < best_error)
+                best[better], best_error[better] = row[better, k], err[better]
+            # Higher-order entries drifting apart: the rest of the sequence is noise
+            drift = np.abs(row[:, n] - previous[:, n - 1])
+            active &= ~(drift >= SAFE * best_error)
+            previous = row
+    return best, best_error
+
+
+def _diverges(S):
+    """+1 / -1 where a sequence is running off to ±infinity, else 0"""
+    tail = np.abs(S[:, -4:])
+    with np.errstate(all='ignore'):
+        # Values that are infinite throughout overflowed; they were never seen growing
+        growing = np.all(tail[:, 1:] >= 1.5 * tail[:, :-1], axis=1) & (tail[:, -1] > 1e3) \
+            & np.isfinite(S[:, 0])
+    return np.where(growing, np.sign(S[:, -1]), 0)
+
+
+def limit_batch(problems: List[tuple]) -> List[tuple]:
+    """
+    Limits of many (function, point, side) problems; side is +1, -1 or 0 for two-sided
+    Returns (value, error_estimate, converged, note) for each
+    """
+    sides, owners, sequences = [], [], []
+    failed = set()
+    for p, (function, point, side) in enumerate(problems):
+        directions = (1, -1) if side == 0 and not math.isinf(point) else (side or 1,)
+        if math.isinf(point):
+            directions = (1,)
+        for direction in directions:
+            x, _ = _sample_points(point, direction)
+            try:
+                sequences.append(function(x))
+            except Exception:
+                sequences.append(np.full(LIMIT_STEPS, np.nan))
+                failed.add(p)
+            owners.append(p)
+            sides.append(direction)
+
+    S = np.array(sequences, dtype=float).reshape(len(sequences), LIMIT_STEPS)
+    values, errors = _richardson(S)
+    divergence = _diverges(S)
+
+    results = []
+    for p in range(len(problems)):
+        rows = [i for i, owner in enumerate(owners) if owner == p]
+        if p in failed:
+            results.append((math.nan, math.inf, False, 'function could not be evaluated'))
+            continue
+        if any(np.isinf(S[i]).any() and not divergence[i] for i in rows):
+            results.append((math.nan, math.inf, False, 'values overflow floating point near the point'))
+            continue
+        if all(divergence[i] != 0 for i in rows):
+            signs = {divergence[i] for i in rows}
+            if len(signs) == 1:
+                results.append((math.copysign(math.inf, signs.pop()), 0.0, True, 'diverges'))
+            else:
+                results.append((math.nan, math.inf, False,
+                                'limit does not exist: left and right limits are ±∞ with opposite signs'))
+            continue
+        if any(divergence[i] != 0 for i in rows):
+            # Two-sided, one side running off to infinity and the other not
+            finite = {i: values[i] if errors[i] <= LIMIT_TOL * max(1.0, abs(values[i])) else S[i, -1]
+                      for i in rows}
+            sides_found = {sides[i]: ('+∞' if divergence[i] > 0 else '-∞') if divergence[i]
+                           else f"{finite[i]:.6g}" for i in rows}
+            results.append((math.nan, math.inf, False,
+                            f"limit does not exist: right limit {sides_found[1]}, left limit {sides_found[-1]}"))
+            continue
+
+        found = [(values[i], errors[i]) for i in rows]
+        if any(not math.isfinite(v) for v, _ in found):
+            results.append((math.nan, math.inf, False, 'function is undefined near the point'))
+            continue
+        value = sum(v for v, _ in found) / len(found)
+        error = max(e for _, e in found)
+        tolerance = LIMIT_TOL * max(1.0, abs(value))
+        if len(found) == 2 and abs(found[0][0] - found[1][0]) > max(tolerance, 10 * error):
+            results.append((math.nan, math.inf, False,
+                            f"limit does not exist: right limit {found[0][0]:.6g} ≠ left limit {found[1][0]:.6g}"))
+            continue
+        results.append((value, error, error <= tolerance, '' if error <= tolerance else 'did not settle'))
+    return results
+
+
+def limit(function: Callable, point: float, side: int = 0) -> tuple:
+    """(value, error_estimate, converged, note) for one limit"""
+    return limit_batch([(function, point, side)])[0]
+
+
+# --- Parsing question text -----------------------------------------------------------------
+
+_END = r'(?=\s*(?:\bd[a-z]\b|[?;]|,\s|\.\s|\.$|$))'
+INTEGRAL_BOUNDS_FIRST = re.compile(
+    r'(?:∫|\bintegral\b|\bintegrate\b)\s*(?:of\s+)?'
+    r'(?:_\s*\{?(?P<a>[^{}\s^]+)\}?\s*\^\s*\{?(?P<b>[^{}\s]+?)\}?|(?P<a2>-?\d+(?:\.\d+)?)\s*\^\s*(?P<b2>\S+?)'
+    r'|from\s+(?P<a3>.+?)\s+to\s+(?P<b3>\S+?))\s+(?:of\s+)?(?P<f>.+?)\s*(?:\bd(?P<v>[a-z])\b|' + _END + ')',
+    re.IGNORECASE)
+INTEGRAL_BOUNDS_LAST = re.compile(
+    r'(?:∫|\bintegral\b|\bintegrate\b)\s*(?:of\s+)?(?P<f>.+?)\s*(?:\bd(?P<v>[a-z])\b\s*)?,?\s*'
+    r'(?:from|between)\s+(?P<a>.+?)\s+(?:to|and)\s+(?P<b>[^\s,?;]+)', re.IGNORECASE)
+LIMIT_POINT_FIRST = re.compile(
+    r'\blim(?:it)?\s*_?\s*\{?\s*(?:as\s+)?(?P<v>[a-z])\s*(?:->|tends to|approaches|goes to|to)\s*'
+    r'(?P<p>[^\s{}]+?)\s*\}?\s+(?:of\s+)?(?P<f>.+?)' + _END, re.IGNORECASE)
+LIMIT_POINT_LAST = re.compile(
+    r'\blim(?:it)?\s+(?:of\s+)?(?P<f>.+?)\s*,?\s+as\s+(?P<v>[a-z])\s*(?:->|tends to|approaches|goes to|to)\s*'
+    r'(?P<p>[^\s,?;]+)', re.IGNORECASE)
+
+
+def _clean(token: str) -> str:
+    return token.strip().rstrip('.,?;:')
+
+
+def _point(token: str) -> tuple:
+    """'0+' -> (0.0, 1), 'pi/2-' -> (pi/2, -1), 'inf' -> (inf, 0)"""
+    token = _clean(token).replace('^', '')
+    side = 0
+    if len(token) > 1 and token[-1] in '+-':
+        side = 1 if token[-1] == '+' else -1
+        token = token[:-1]
+    return evaluate_constant(token), side
+
+
+def parse(text: str) -> Optional[Problem]:
+    """Find a definite integral or a limit in question text"""
+    text = text.translate(UNICODE)
+    try:
+        for pattern in (INTEGRAL_BOUNDS_FIRST, INTEGRAL_BOUNDS_LAST):
+            match = pattern.search(text)
+            if match:
+                groups = match.groupdict()
+                a = groups.get('a') or groups.get('a2') or groups.get('a3')
+                b = groups.get('b') or groups.get('b2') or groups.get('b3')
+                variable = (groups.get('v') or 'x').lower()
+                expression = _clean(groups['f'])
+                function = compile_expression(expression, variable)
+                bounds = (evaluate_constant(_clean(a)), evaluate_constant(_clean(b)))
+                return Problem('integral', f"∫ {expression} d{variable} from {_clean(a)} to {_clean(b)}",
+                               variable, function, bounds)
+
+        for pattern in (LIMIT_POINT_FIRST, LIMIT_POINT_LAST):
+            match = pattern.search(text)
+            if match:
+                variable, expression = match.group('v').lower(), _clean(match.group('f'))
+                point, side = _point(match.group('p'))
+                function = compile_expression(expression, variable)
+                approach = _clean(match.group('p'))
+                return Problem('limit', f"lim {variable}→{approach} {expression}", variable, function,
+                               (point, side))
+    except (ValueError, SyntaxError, TypeError, OverflowError, ZeroDivisionError, RecursionError,
+            MemoryError):
+        return None
+    return None
+
+
+def solve_problems(problems: List[Optional[Problem]]) -> List[Optional[Estimate]]:
+    """Integrals in one quadrature batch, limits in one extrapolation batch"""
+    estimates = [None] * len(problems)
+
+    integrals = [i for i, p in enumerate(problems) if p is not None and p.kind == 'integral']
+    results = integrate_batch([(problems[i].function, *problems[i].args) for i in integrals])
+    for i, (value, error, converged, evaluations) in zip(integrals, results):
+        if math.isnan(value):
+            note = 'integrand could not be evaluated on the range'
+        else:
+            note = f"{evaluations} function evaluations"
+        estimates[i] = Estimate('integral', problems[i].expression, value, error, converged, note)
+
+    limits = [i for i, p in enumerate(problems) if p is not None and p.kind == 'limit']
+    results = limit_batch([(problems[i].function, *problems[i].args) for i in limits]) if limits else []
+    for i, (value, error, converged, note) in zip(limits, results):
+        estimates[i] = Estimate('limit', problems[i].expression, value, error, converged, note)
+
+    return estimates
+
+
+def evaluate_batch(texts: Iterable[str]) -> List[Optional[Estimate]]:
+    """Numeric answers (with error estimates) for many questions at once"""
+    return solve_problems([parse(text) for text in texts])
+
+
+def evaluate(text: str) -> Optional[Estimate]:
+    """Numeric answer for one integral or limit question, or None if none is found"""
+    return evaluate_batch([text])[0]
+
+
+# --- Cross-checking and formatting ---------------------------------------------------------
+
+def agrees(estimate: Estimate, claimed: float, rel_tol: float = 1e-6) -> bool:
+    """True if a symbolic answer is consistent with the numeric estimate"""
+    if estimate.value is None or math.isnan(estimate.value):
+        return False
+    if math.isinf(estimate.value) or math.isinf(claimed):
+        return estimate.value == claimed
+    return abs(estimate.value - claimed) <= max(3 * estimate.error, rel_tol * max(1.0, abs(claimed)))
+
+
+def recognize(value: float, error: float) -> Optional[str]:
+    """A simple closed form (p/q or p/q·π) matching the value within its error, if there is one"""
+    if not math.isfinite(value) or error > 1e-6:
+        return None
+    tolerance = max(10 * error, 1e-9 * max(1.0, abs(value)))
+    for unit, suffix in ((1.0, ''), (math.pi, 'π')):
+        fraction = Fraction(value / unit).limit_denominator(1000)
+        if abs(float(fraction) * unit - value) <= tolerance:
+            if fraction == 0:
+                return '0'
+            if not suffix:
+                return str(fraction)
+            numerator = {1: '', -1: '-'}.get(fraction.numerator, str(fraction.numerator))
+            return f"{numerator}π" + (f"/{fraction.denominator}" if fraction.denominator != 1 else '')
+    return None
+
+
+def _undetermined(estimate: Estimate) -> bool:
+    """
+    No number can be trusted: the error is unbounded or outweighs the value, or the
+    estimate isn't converged and its error is not small
+    """
+    error, value = estimate.error, abs(estimate.value)
+    if not math.isfinite(error):
+        return True
+    if error <= TRUSTED_ERROR * max(1.0, value):
+        return False
+    return error > value or not estimate.converged
+
+
+def format_estimate(estimate: Estimate) -> str:
+    value = estimate.value
+    if math.isnan(value):
+        return f"not determined ({estimate.note})"
+    if _undetermined(estimate):
+        return UNDETERMINED[estimate.kind]
+    if math.isinf(value):
+        return '+∞' if value > 0 else '-∞'
+    text = f"{value:.10g} ± {estimate.error:.1e}"
+    closed_form = recognize(value, estimate.error)
+    if closed_form is not None:
+        text += f" (≈ {closed_form})"
+    if not estimate.converged:
+        text += " ⚠️ tolerance not reached"
+    return text
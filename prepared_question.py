@@ -0,0 +1,98 @@
+# One-pass question preprocessing shared by every solver stage
+# The question is lowered once; derived views are computed on first use and kept
+
+import re
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+# Keywords used to score which subject a question belongs to
+SUBJECT_KEYWORDS = {
+    'physics': ('velocity', 'acceleration', 'force', 'energy', 'momentum',
+                'electric', 'magnetic', 'wave', 'optics', 'thermodynamics'),
+    'chemistry': ('molecule', 'reaction', 'acid', 'base', 'molarity',
+                  'organic', 'bond', 'electron', 'atom', 'compound'),
+    'mathematics': ('derivative', 'integral', 'limit', 'matrix', 'probability',
+                    'equation', 'function', 'graph', 'solve', 'calculate')
+}
+
+# Numbers including decimals and scientific notation
+NUMBER_PATTERN = re.compile(r'-?\d+\.?\d*(?:[eE][+-]?\d+)?')
+
+_UNSET = object()
+
+
+class PreparedQuestion:
+    """
+    Immutable, preprocessed view of a question
+    text, quantities, key and features are each computed at most once
+    """
+
+    __slots__ = ('raw', 'subject', 'text', '_quantities', '_key', '_features')
+
+    def __init__(self, question: str, subject: str = None):
+        set_slot = object.__setattr__
+        set_slot(self, 'raw', question)
+        set_slot(self, 'subject', subject)
+        set_slot(self, 'text', question.lower())
+        set_slot(self, '_quantities', _UNSET)
+        set_slot(self, '_key', _UNSET)
+        set_slot(self, '_features', _UNSET)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PreparedQuestion is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("PreparedQuestion is immutable")
+
+    def __reduce__(self):
+        # Rebuilt from the raw question when sent to worker processes
+        return (PreparedQuestion, (self.raw, self.subject))
+
+    def __repr__(self):
+        return f"PreparedQuestion({self.raw[:40]!r}, subject={self.subject!r})"
+
+    def _cache(self, name, value):
+        object.__setattr__(self, name, value)
+        return value
+
+    @property
+    def quantities(self) -> Tuple[float, ...]:
+        """Numerical values in the order they appear"""
+        if self._quantities is _UNSET:
+            numbers = []
+            for match in NUMBER_PATTERN.finditer(self.text):
+                try:
+                    numbers.append(float(match.group()))
+                except ValueError:
+                    continue
+            return self._cache('_quantities', tuple(numbers))
+        return self._quantities
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        """Whitespace-insensitive (question, subject) key; case is kept since 5P3 and x are case-sensitive"""
+        if self._key is _UNSET:
+            return self._cache('_key', (' '.join(self.raw.split()), self.subject))
+        return self._key
+
+    @property
+    def features(self) -> Mapping[str, int]:
+        """Subject classifier features: number of each subject's keywords present"""
+        if self._features is _UNSET:
+            scores = {
+                subject: sum(1 for kw in keywords if kw in self.text)
+                for subject, keywords in SUBJECT_KEYWORDS.items()
+            }
+            return self._cache('_features', MappingProxyType(scores))
+        return self._features
+
+    def mentions(self, *words: str) -> bool:
+        """True if any of the words occurs in the question (substring match)"""
+        return any(word in self.text for word in words)
+
+
+def prepare(question, subject: str = None) -> PreparedQuestion:
+    """Return a PreparedQuestion, reusing one that is already prepared"""
+    if isinstance(question, PreparedQuestion):
+        return question
+    return PreparedQuestion(question, subject)
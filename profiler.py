@@ -0,0 +1,276 @@
+# Opt-in per-request profiling with flamegraph-ready output
+# A sampler thread snapshots the profiled request's stack every few milliseconds and the
+# counts are written as collapsed stacks ("outer;inner;leaf count" per line), which
+# flamegraph.pl, speedscope and inferno read directly. Only the N slowest profiles are
+# kept, each with its question text, pruned by a background thread rather than the
+# request. When profiling is off, begin() returns at once.
+
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), 'jee-profiles')
+PROFILE_ID_PATTERN = re.compile(r'^\d+-\d+-\d+$')
+MAX_QUESTION_CHARS = 2000
+
+
+def _setting(name: str, value: Optional[str], default, convert):
+    """
+    A profiling setting (value, else the environment variable) converted to a number
+    Profiling is optional: a bad value warns and falls back instead of stopping the app
+    """
+    if value is None:
+        value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return convert(value)
+    except ValueError:
+        print(f"⚠️ Ignoring {name}={value!r}: expected a number, using {default}", file=sys.stderr)
+        return default
+
+
+class StackSampler(threading.Thread):
+    """Counts the distinct stacks of one thread, sampled every `interval` seconds"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name='jee-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._labels = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            self.counts[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class ProfileSession:
+    """One request being profiled"""
+
+    __slots__ = ('question', 'subject', 'started_at', 'started', 'sampler')
+
+    def __init__(self, question: str, subject: str, sampler: StackSampler):
+        self.question = question
+        self.subject = subject
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.sampler = sampler
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and keeps the slowest profiles on disk
+    JEE_PROFILE: off (default), on (every request), or a fraction such as 0.05
+    A request can also ask for itself to be profiled (the X-Profile header, honoured by
+    the app only while profiling is on or with the admin token).
+    Either way at most JEE_PROFILE_RATE profiles start per minute.
+    """
+
+    def __init__(self, mode: str = None, directory: str = None, keep: int = None,
+                 rate_per_minute: float = None, interval_ms: float = None):
+        mode = (mode if mode is not None else os.environ.get('JEE_PROFILE', 'off')).strip().lower()
+        if mode in ('on', 'true', 'yes', 'all'):
+            self.fraction = 1.0
+        elif mode in ('', 'off', 'false', 'no'):
+            self.fraction = 0.0
+        else:
+            self.fraction = min(1.0, max(0.0, _setting('JEE_PROFILE', mode, 0.0, float)))
+        self.directory = directory or os.environ.get('JEE_PROFILE_DIR', DEFAULT_PROFILE_DIR)
+        self.keep = keep if keep is not None else _setting('JEE_PROFILE_KEEP', None, 20, int)
+        self.rate = rate_per_minute if rate_per_minute is not None else _setting('JEE_PROFILE_RATE', None, 6.0, float)
+        if interval_ms is None:
+            interval_ms = _setting('JEE_PROFILE_INTERVAL_MS', None, 2.0, float)
+        self.interval = interval_ms / 1000
+
+        self._lock = threading.Lock()
+        self._tokens = max(1.0, self.rate)
+        self._refilled = time.monotonic()
+        self._ids = itertools.count(1)
+        self._pruner = None
+        self._pruner_pid = None
+        self._prune_wanted = None
+        self.profiled = 0
+        self.rate_limited = 0
+
+    @property
+    def enabled(self) -> bool:
+        """True if JEE_PROFILE samples requests on its own"""
+        return bool(self.fraction)
+
+    def _take_token(self) -> bool:
+        """Token bucket: `rate` profiles per minute, bursting to the same number"""
+        with self._lock:
+            now = time.monotonic()
+            capacity = max(1.0, self.rate)
+            self._tokens = min(capacity, self._tokens + (now - self._refilled) * self.rate / 60)
+            self._refilled = now
+            if self._tokens < 1:
+                self.rate_limited += 1
+                return False
+            self._tokens -= 1
+            return True
+
+    def begin(self, question: str, subject: str = None, requested: bool = False) -> Optional[ProfileSession]:
+        """Start profiling the calling thread, or return None if this request isn't sampled"""
+        if not requested:
+            if not self.fraction:
+                return None
+            if self.fraction < 1 and random.random() >= self.fraction:
+                return None
+        if not self._take_token():
+            return None
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        return ProfileSession(question, subject, sampler)
+
+    def end(self, session: ProfileSession, result: Dict = None) -> Dict:
+        """Stop sampling, write the profile and drop all but the slowest `keep`"""
+        duration = time.perf_counter() - session.started
+        session.sampler.stop()
+
+        profile_id = f"{int(session.started_at * 1000)}-{os.getpid()}-{next(self._ids)}"
+        meta = {
+            'id': profile_id,
+            'question': session.question[:MAX_QUESTION_CHARS],
+            'subject': session.subject,
+            'duration_ms': round(duration * 1000, 2),
+            'samples': session.sampler.samples,
+            'interval_ms': self.interval * 1000,
+            'outcome': 'error' if result is None else ('ok' if result.get('success') else 'failed'),
+            'started_at': session.started_at,
+            'pid': os.getpid()
+        }
+        folded = ''.join(f"{stack} {count}\n" for stack, count in session.sampler.counts.most_common())
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._write(profile_id + '.folded', folded)
+        # Metadata last: a profile is listed only once both files are complete
+        self._write(profile_id + '.json', json.dumps(meta, ensure_ascii=False))
+        with self._lock:
+            self.profiled += 1
+        self._schedule_prune()
+        return meta
+
+    def _write(self, name: str, content: str):
+        path = os.path.join(self.directory, name)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temporary, path)
+
+    def _schedule_prune(self):
+        """Wake the pruning thread, starting it on first use in this process (threads don't survive a fork)"""
+        with self._lock:
+            if self._pruner_pid != os.getpid():
+                self._prune_wanted = threading.Event()
+                self._pruner = threading.Thread(target=self._prune_loop, args=(self._prune_wanted,),
+                                                name='jee-profile-prune', daemon=True)
+                self._pruner_pid = os.getpid()
+                self._pruner.start()
+        self._prune_wanted.set()
+
+    def _prune_loop(self, wanted: threading.Event):
+        while True:
+            wanted.wait()
+            wanted.clear()
+            try:
+                self._prune()
+            except OSError:
+                continue
+
+    def _prune(self):
+        """Keep the slowest profiles; the directory may be shared by several worker processes"""
+        for meta in self.list()[self.keep:]:
+            for extension in ('.json', '.folded'):
+                try:
+                    os.remove(os.path.join(self.directory, meta['id'] + extension))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[Dict]:
+        """Metadata of the kept profiles, slowest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        profiles = []
+        for name in names:
+            if name.endswith('.json'):
+                try:
+                    with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                        profiles.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        profiles.sort(key=lambda meta: meta['duration_ms'], reverse=True)
+        return profiles
+
+    def folded_path(self, profile_id: str) -> Optional[str]:
+        """Path of a profile's collapsed stacks, or None for unknown (or malformed) ids"""
+        if not PROFILE_ID_PATTERN.match(profile_id or ''):
+            return None
+        path = os.path.join(self.directory, profile_id + '.folded')
+        return path if os.path.exists(path) else None
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'fraction': self.fraction,
+            'rate_per_minute': self.rate,
+            'interval_ms': self.interval * 1000,
+            'keep': self.keep,
+            'profiled': self.profiled,
+            'rate_limited': self.rate_limited,
+            'directory': self.directory
+        }
+
+
+def wants_profile(header_value: Optional[str]) -> bool:
+    """True if a request header (X-Profile) asks for this request to be profiled"""
+    return bool(header_value) and header_value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+_request_profiler = None
+_request_profiler_lock = threading.Lock()
+
+
+def get_request_profiler() -> RequestProfiler:
+    """Process-wide profiler, configured from the JEE_PROFILE* environment on first use"""
+    global _request_profiler
+    if _request_profiler is None:
+        with _request_profiler_lock:
+            if _request_profiler is None:
+                _request_profiler = RequestProfiler()
+    return _request_profiler
@@ -0,0 +1,195 @@
+# Process-pool execution mode for CPU-heavy solving
+# Keeps long solves off the Flask request threads (and out of their GIL)
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict
+
+# Solver instance owned by each pool worker, created once by the initializer
+_worker_solver = None
+
+
+def _init_worker(solver_factory: Callable):
+    """Build the worker's solver once so every task runs on a warm instance"""
+    global _worker_solver
+    _worker_solver = solver_factory()
+
+
+def _warm_up(delay: float) -> int:
+    """No-op task used to make sure every worker has started and initialized"""
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _run(method: str, args: tuple, submitted_at: float):
+    """Call a solver method inside the worker and report when it actually started"""
+    started_at = time.time()
+    result = getattr(_worker_solver, method)(*args)
+    return result, started_at - submitted_at
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool's bounded queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Solver pool is busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PoolTimeout(Exception):
+    """Raised when a request does not finish within the per-request timeout"""
+
+
+class SolverPool:
+    """
+    Bounded process pool of warm solver workers
+    At most max_workers tasks run and max_queue more wait; anything beyond is rejected
+    """
+
+    def __init__(self, solver_factory: Callable, max_workers: int = None, max_queue: int = None,
+                 timeout: float = 30.0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = self.max_workers * 2 if max_queue is None else max_queue
+        self.timeout = timeout
+        self._solver_factory = solver_factory
+        self._executor = self._new_executor()
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.failed = 0
+        self.restarts = 0
+        self.recycles = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   initializer=_init_worker,
+                                   initargs=(self._solver_factory,))
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Replace an executor broken by a dead worker (once, however many callers noticed)"""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_executor()
+            self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, *args):
+        """Submit to the current executor, restarting it once if a worker has died"""
+        executor = self._executor
+        try:
+            return executor.submit(*args)
+        except BrokenProcessPool:
+            self._restart(executor)
+            return self._executor.submit(*args)
+
+    def recycle(self):
+        """
+        Move new requests to fresh workers, e.g. after the knowledge base changed
+        Tasks already queued or running finish on the old workers
+        """
+        with self._lock:
+            previous, self._executor = self._executor, self._new_executor()
+            self.recycles += 1
+        previous.shutdown(wait=False)
+        self.warm()
+
+    def warm(self, delay: float = 0.05):
+        """Start every worker process now instead of on the first requests"""
+        futures = [self._submit(_warm_up, delay) for _ in range(self.max_workers)]
+        return {future.result() for future in futures}
+
+    def queue_depth(self) -> int:
+        """Requests accepted but not yet running"""
+        with self._lock:
+            return max(0, self.in_flight - self.max_workers)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, based on mean run time"""
+        with self._lock:
+            mean_run = self.total_run / self.completed if self.completed else 1.0
+        return max(1, int(round(mean_run * (self.max_queue / self.max_workers + 1))))
+
+    def submit(self, method: str, *args):
+        """Run solver.method(*args) in a worker and wait for the result"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolSaturated(self.retry_after())
+
+        with self._lock:
+            self.in_flight += 1
+
+        start = time.perf_counter()
+        executor = self._executor
+        try:
+            future = self._submit(_run, method, args, time.time())
+        except BaseException:
+            # Never queued, so no done callback will give the slot back
+            with self._lock:
+                self.failed += 1
+            self._release(None)
+            raise
+        # The slot is held until the task really finishes, even if the caller gave up
+        future.add_done_callback(self._release)
+        try:
+            result, waited = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A running task cannot be killed, but a queued one can still be dropped
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise PoolTimeout(f"Solving took longer than {self.timeout}s")
+        except BrokenProcessPool:
+            # A worker died mid-task: fail this request, serve the next on fresh workers
+            with self._lock:
+                self.failed += 1
+            self._restart(executor)
+            raise
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+
+        with self._lock:
+            self.completed += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            self.total_run += time.perf_counter() - start - waited
+        return result
+
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'queue_depth': max(0, self.in_flight - self.max_workers),
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'failed': self.failed,
+                'restarts': self.restarts,
+                'recycles': self.recycles,
+                'mean_wait_ms': round(self.total_wait / self.completed * 1000, 2) if self.completed else 0,
+                'max_wait_ms': round(self.max_wait * 1000, 2)
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
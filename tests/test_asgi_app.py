@@ -0,0 +1,30 @@
+import asyncio
+import json
+
+import pytest
+
+import asgi_app
+
+
+def _post(path, body):
+    """Run one POST through the ASGI app, body split into 16 KB messages"""
+    chunks = [body[i:i + 16384] for i in range(0, len(body), 16384)]
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': chunks.pop(0), 'more_body': bool(chunks)}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'path': path, 'method': 'POST', 'headers': []}
+    asyncio.run(asgi_app.app(scope, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+@pytest.mark.parametrize('path', ['/solve', '/classify'])
+def test_oversized_body_is_413(path):
+    body = json.dumps({'question': 'x' * (asgi_app.MAX_BODY_BYTES + 1), 'subject': 'physics'}).encode()
+    status, payload = _post(path, body)
+    assert status == 413
+    assert payload['success'] is False
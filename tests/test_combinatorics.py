@@ -0,0 +1,45 @@
+from fractions import Fraction
+
+import pytest
+
+import combinatorics
+
+
+def test_not_equals_is_not_a_factorial():
+    assert combinatorics.evaluate("If 3 != x, find x") is None
+    assert combinatorics.evaluate("Find the probability that 3 != x") is None
+
+
+def test_factorial_still_recognised():
+    assert combinatorics.evaluate("Find 5!").value == 120
+
+
+def test_maths_without_a_counting_cue_is_not_answered():
+    import app
+    solution = app.JEESolver().solve_mathematics("If 3 != x, find x")
+    assert "3! = 6" not in solution
+    assert "PROBABILITY" not in solution
+
+
+@pytest.mark.parametrize('text', ["Evaluate 5P3", "evaluate 5p3", "P(5, 3)", "p(5,3)"])
+def test_permutation_notation_ignores_case(text):
+    assert combinatorics.evaluate(text).value == 60
+
+
+@pytest.mark.parametrize('text, value', [
+    ("exactly 2 sixes in 5 rolls of a die", Fraction(625, 3888)),
+    ("exactly 3 heads in 10 tosses of a coin", Fraction(15, 128)),
+    ("at least 2 successes in 5 trials with p = 1/3", Fraction(131, 243)),
+])
+def test_binomial(text, value):
+    assert combinatorics.evaluate(text).value == value
+
+
+@pytest.mark.parametrize('text', [
+    "exactly 3 even numbers in 5 rolls of a die",
+    "a sum of 9 exactly 2 times in 5 throws of two dice",
+    "I studied: exactly 2 sixes in 5 trials",
+    "exactly 2 heads in 5 tosses, p = 1.5",
+])
+def test_binomial_with_unknown_probability_falls_through(text):
+    assert combinatorics.evaluate(text) is None
@@ -0,0 +1,35 @@
+import random
+from fractions import Fraction
+
+import pytest
+
+import linear_algebra
+
+
+def test_inconsistent_third_equation_is_not_dropped():
+    answer = linear_algebra.evaluate("x + y = 2, x - y = 0, x + y + 1 = 5")
+    assert answer.value == 'inconsistent'
+
+
+def test_terms_on_both_sides_and_uppercase_variables():
+    assert linear_algebra.evaluate("Solve X + Y = 2 and X - Y = 0").value == {'x': 1, 'y': 1}
+    assert linear_algebra.evaluate("Solve: x + 2y - 3 = 4 - y, 0.5x + y = 2.").value == {'x': -2, 'y': 3}
+
+
+def test_three_variables():
+    value = linear_algebra.evaluate("x + y + z = 6, x - y = 0, 2x + y - z = 0").value
+    assert value == {'x': Fraction(6, 5), 'y': Fraction(6, 5), 'z': Fraction(18, 5)}
+
+
+@pytest.mark.parametrize('text', ["x + y = 2, x^2 + y = 3", "x + y = 2, x - y = 3^2", "x = 2 and y = 3"])
+def test_unparsed_equation_rejects_the_system(text):
+    assert linear_algebra.parse_system(text) is None
+
+
+def test_large_integer_determinant_is_not_rounded_from_floats():
+    generator = random.Random(1)
+    rows = [[generator.randint(-999, 999) for _ in range(9)] for _ in range(9)]
+    assert abs(linear_algebra.determinant(rows)) > 2 ** 53
+    text = "determinant of [" + "; ".join(" ".join(map(str, row)) for row in rows) + "]"
+    answer = linear_algebra.evaluate(text)
+    assert answer.value == linear_algebra.determinant(rows)
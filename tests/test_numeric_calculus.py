@@ -0,0 +1,24 @@
+import pytest
+
+import numeric_calculus
+
+
+@pytest.mark.parametrize('text, shown', [
+    ("integral of 1/x from -1 to 1", "diverges (numerically undetermined)"),
+    ("lim x->0 sin(1/x)", "limit does not exist (numerically undetermined)"),
+])
+def test_undetermined_results_are_not_shown_as_numbers(text, shown):
+    assert numeric_calculus.format_estimate(numeric_calculus.evaluate(text)) == shown
+
+
+@pytest.mark.parametrize('text, closed_form', [
+    ("integral of x^2 from 0 to 3", "9"),
+    ("integral of 1/sqrt(x) from 0 to 1", "2"),
+    ("lim x->0 sin(x)/x", "1"),
+])
+def test_settled_results_keep_their_value(text, closed_form):
+    assert f"(≈ {closed_form})" in numeric_calculus.format_estimate(numeric_calculus.evaluate(text))
+
+
+def test_one_sided_divergence_is_infinite():
+    assert numeric_calculus.format_estimate(numeric_calculus.evaluate("lim x->0 1/x^2")) == '+∞'
@@ -0,0 +1,6 @@
+from prepared_question import prepare
+
+
+def test_key_ignores_whitespace_but_keeps_case():
+    assert prepare("Evaluate  5P3 ", 'mathematics').key == prepare("Evaluate 5P3", 'mathematics').key
+    assert prepare("Evaluate 5P3", 'mathematics').key != prepare("evaluate 5p3", 'mathematics').key
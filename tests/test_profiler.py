@@ -0,0 +1,14 @@
+from profiler import RequestProfiler
+
+
+def test_invalid_settings_fall_back(monkeypatch):
+    monkeypatch.setenv('JEE_PROFILE', 'maybe')
+    monkeypatch.setenv('JEE_PROFILE_RATE', 'often')
+    profiler = RequestProfiler()
+    assert not profiler.enabled
+    assert profiler.rate == 6.0
+
+
+def test_keep_zero_is_honoured(monkeypatch):
+    monkeypatch.setenv('JEE_PROFILE_KEEP', '0')
+    assert RequestProfiler().keep == 0